@@ -21,8 +21,7 @@ from sqlalchemy.orm import Session
 from sec_extractor.config.settings import settings
 from sec_extractor.core.tiered_processor import TieredProcessor
 from sec_extractor.discovery.daily_feed import DailyFeed
-from sec_extractor.storage.database import DatabaseManager
-from sec_extractor.storage.models import Filing
+from sec_extractor.storage.models import Filing, ProcessingStatus, accession_to_int
 
 # --- Logging Setup ---
 # Configure logging to write to a file and to the console
@@ -63,18 +62,32 @@ def process_filings_for_date(
 
     logger.info(f"Discovered {len(discovered_filings)} filings.")
 
-    # 2. Filter out filings that are already in the database
-    accession_numbers = [f['accession_number'] for f in discovered_filings]
+    # 2. Filter out filings that are already in the database. Filings still
+    # pending were only pre-registered by an interrupted run, so retry them.
+
+    # A malformed accession number skips that filing, not the whole day
+    valid_filings, accession_ints = [], []
+    for f in discovered_filings:
+        try:
+            accession_ints.append(accession_to_int(f['accession_number']))
+        except (KeyError, AttributeError, ValueError):
+            logger.warning(f"Skipping filing with invalid accession number: {f.get('accession_number')!r}")
+            continue
+        valid_filings.append(f)
+
     existing_filings = (
-        db_session.query(Filing.accession_number)
-        .filter(Filing.accession_number.in_(accession_numbers))
+        db_session.query(Filing.accession_int)
+        .filter(
+            Filing.accession_int.in_(accession_ints),
+            Filing.processing_status != ProcessingStatus.PENDING
+        )
         .all()
     )
-    existing_accession_numbers = {acc for (acc,) in existing_filings}
+    existing_accession_ints = {acc for (acc,) in existing_filings}
     
     new_filings = [
-        f for f in discovered_filings 
-        if f['accession_number'] not in existing_accession_numbers
+        f for f, acc in zip(valid_filings, accession_ints)
+        if acc not in existing_accession_ints
     ]
 
     logger.info(f"Found {len(new_filings)} new filings to process.")
@@ -82,10 +95,19 @@ def process_filings_for_date(
     if not new_filings:
         return
 
-    # 3. Process new filings, respecting the max_filings limit
+    # 3. Respect the max_filings limit
     filings_to_process = new_filings[:max_filings] if max_filings else new_filings
     logger.info(f"Processing a maximum of {len(filings_to_process)} filings.")
 
+    # 4. Pre-register the batch with a single bulk upsert (safe on reruns)
+    try:
+        registered = processor.db.bulk_create_filings(filings_to_process)
+        logger.info(f"Pre-registered {registered} filings as pending.")
+    except Exception:
+        # Not fatal: process_filing upserts each filing on its own
+        logger.error("Bulk pre-registration failed; continuing per filing.", exc_info=True)
+
+    # 5. Process new filings
     for i, filing_meta in enumerate(filings_to_process):
         accession_number = filing_meta['accession_number']
         logger.info(f"Processing {i+1}/{len(filings_to_process)}: {accession_number} ({filing_meta['company_name']})")
@@ -110,9 +132,9 @@ def main():
     parser.add_argument("--max-filings", type=int, help="Maximum number of filings to process per day.")
     args = parser.parse_args()
 
-    db_manager = DatabaseManager(settings.database_url)
-    session = db_manager.get_session()
     processor = TieredProcessor(settings.database_url)
+    # Same engine/pool as the processor (and its DLQ)
+    session = processor.db.get_session()
 
     try:
         dates_to_process = []
@@ -132,6 +154,12 @@ def main():
         
         logger.info(f"Processing for dates: {[d.isoformat() for d in dates_to_process]}")
 
+        # Create this month's and next month's partitions ahead of the inserts
+        try:
+            processor.db.ensure_upcoming_partitions()
+        except Exception:
+            logger.error("Could not create upcoming table partitions.", exc_info=True)
+
         for target_date in dates_to_process:
             process_filings_for_date(session, processor, target_date, args.max_filings)
 
@@ -18,6 +18,10 @@ class Settings:
     # === DATABASE CONFIGURATION ===
     database_url: str = field(default_factory=lambda: os.getenv('DATABASE_URL'))
     database_echo: bool = field(default_factory=lambda: os.getenv('DATABASE_ECHO', 'false').lower() == 'true')
+    # Por engine (DatabaseManager); el total del proceso debe quedar bajo max_connections de PG
+    DB_POOL_SIZE: int = field(default_factory=lambda: int(os.getenv('DB_POOL_SIZE', '10')))
+    DB_MAX_OVERFLOW: int = field(default_factory=lambda: int(os.getenv('DB_MAX_OVERFLOW', '20')))
+    DB_POOL_RECYCLE: int = field(default_factory=lambda: int(os.getenv('DB_POOL_RECYCLE', '1800')))
     
     # === SEC API CONFIGURATION ===
     sec_api_user_agent: str = field(default_factory=lambda: os.getenv('SEC_USER_AGENT'))
@@ -82,9 +86,10 @@ class Settings:
         return {
             'url': self.database_url,
             'echo': self.database_echo,
-            'pool_size': 10,
-            'max_overflow': 20,
-            'pool_pre_ping': True
+            'pool_size': self.DB_POOL_SIZE,
+            'max_overflow': self.DB_MAX_OVERFLOW,
+            'pool_pre_ping': True,
+            'pool_recycle': self.DB_POOL_RECYCLE
         }
 
 # Instancia global de configuración
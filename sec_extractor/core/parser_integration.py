@@ -4,8 +4,11 @@ This module provides the integration layer between the new parser system
 and the existing Edgar pipeline TieredProcessor.
 """
 
+import codecs
+import io
 import logging
-from typing import Dict, Any, Optional, List
+import re
+from typing import Dict, Any, Optional, List, IO, Iterator, Union
 from datetime import datetime
 import time
 
@@ -15,6 +18,16 @@ from ..storage.database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Inline XBRL facts (<ix:nonFraction>/<ix:nonNumeric>) and their attributes.
+# Compiled once at import so every parse_filing_content call reuses them.
+_IX_RE = re.compile(r'<ix:(nonFraction|nonNumeric)\b([^>]*)>([^<]*)</ix:\1>', re.DOTALL)
+_IX_ATTR_RE = re.compile(r'([\w:-]+)="([^"]*)"')
+
+# Chunk size for parse_filing_stream, and the longest fact carried over
+# between chunks (an <ix:non...> tag still open past that is malformed)
+_STREAM_CHUNK_SIZE = 64 * 1024
+_STREAM_MAX_CARRY = 64 * 1024
+
 
 class ParserManager:
     """
@@ -50,12 +63,20 @@ class ParserManager:
         """Check if parsing is available."""
         return self.filing_parser is not None
     
-    def parse_filing_content(self, content: str, filing_meta: Dict[str, Any], tier: str) -> Dict[str, Any]:
+    def parse_filing_content(
+        self,
+        content: Union[str, bytes, memoryview],
+        filing_meta: Dict[str, Any],
+        tier: str
+    ) -> Dict[str, Any]:
         """
         Parse filing content using the integrated parser system.
         
+        Bytes-like content is never encoded/decoded as a whole by the
+        fallback path: it is scanned through the chunked stream reader.
+        
         Args:
-            content: Raw filing content (HTML/SGML)
+            content: Raw filing content (HTML/SGML), as text or bytes
             filing_meta: Filing metadata dictionary
             tier: Processing tier (standard, limited, minimal)
             
@@ -98,6 +119,29 @@ class ParserManager:
                 "extraction_method": "parser_integration_failed"
             }
     
+    def parse_filing_stream(self, reader: IO, filing_meta: Dict[str, Any], tier: str) -> Dict[str, Any]:
+        """
+        Parse filing content from a file-like object.
+        
+        Without the integrated parser, facts are scanned in 64KB chunks so
+        memory stays bounded by the chunk size instead of the filing size.
+        The integrated parser needs the whole document, so in that case the
+        reader is consumed and handed to parse_filing_content.
+        
+        Args:
+            reader: Binary or text file-like object with the raw filing
+            filing_meta: Filing metadata dictionary
+            tier: Processing tier (standard, limited, minimal)
+            
+        Returns:
+            Dictionary containing parsing results and statistics
+        """
+        if self.is_available():
+            return self.parse_filing_content(reader.read(), filing_meta, tier)
+        
+        logger.info("Using fallback extraction method (streaming)")
+        return self._fallback_result(list(self._scan_ix_facts_stream(reader)), tier)
+    
     def _convert_to_legacy_format(
         self, 
         parsing_result: ParsingResult, 
@@ -185,62 +229,79 @@ class ParserManager:
     
     def _extract_xbrl_facts_summary(self, xbrl_facts: List[XBRLFact]) -> Dict[str, Any]:
         """Extract XBRL facts summary for legacy format."""
-        if not xbrl_facts:
+        return self._summarize_facts([
+            {
+                "concept": fact.concept,
+                "value": fact.value,
+                "unit_ref": fact.unit_ref,
+                "context_ref": fact.context_ref
+            }
+            for fact in xbrl_facts
+        ])
+    
+    def _summarize_facts(self, facts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the xbrl_metrics summary from fact dictionaries.
+        
+        Shared by the parser path and the fallback scan so both report the
+        same keys (including concept_summary).
+        """
+        if not facts:
             return {}
         
-        # Group facts by concept for summary
+        # Group facts by concept for summary (one dict lookup per fact;
+        # the summary keys double as the set of unique concepts)
         concept_summary = {}
-        total_facts = len(xbrl_facts)
-        unique_concepts = set()
-        unique_contexts = set()
-        
-        for fact in xbrl_facts:
-            unique_concepts.add(fact.concept)
-            if fact.context_ref:
-                unique_contexts.add(fact.context_ref)
-            
-            if fact.concept not in concept_summary:
-                concept_summary[fact.concept] = {
-                    "count": 0,
-                    "sample_value": None,
-                    "unit_ref": None
+        for fact in facts:
+            entry = concept_summary.get(fact["concept"])
+            if entry is None:
+                concept_summary[fact["concept"]] = {
+                    "count": 1,
+                    "sample_value": fact["value"],
+                    "unit_ref": fact["unit_ref"]
                 }
+                continue
             
-            concept_summary[fact.concept]["count"] += 1
-            if concept_summary[fact.concept]["sample_value"] is None:
-                concept_summary[fact.concept]["sample_value"] = fact.value
-                concept_summary[fact.concept]["unit_ref"] = fact.unit_ref
+            entry["count"] += 1
+            if entry["sample_value"] is None:
+                entry["sample_value"] = fact["value"]
+                entry["unit_ref"] = fact["unit_ref"]
         
         return {
-            "total_facts": total_facts,
-            "unique_concepts": len(unique_concepts),
-            "unique_contexts": len(unique_contexts),
+            "total_facts": len(facts),
+            "unique_concepts": len(concept_summary),
+            "unique_contexts": len({fact["context_ref"] for fact in facts if fact["context_ref"]}),
             "concept_summary": concept_summary,
-            "sample_facts": [
-                {
-                    "concept": fact.concept,
-                    "value": fact.value,
-                    "unit_ref": fact.unit_ref,
-                    "context_ref": fact.context_ref
-                }
-                for fact in xbrl_facts[:5]  # First 5 facts as sample
-            ]
+            "sample_facts": facts[:5]  # First 5 facts as sample
         }
     
-    def _fallback_extraction(self, content: str, filing_meta: Dict[str, Any], tier: str) -> Dict[str, Any]:
+    def _fallback_extraction(
+        self,
+        content: Union[str, bytes, memoryview],
+        filing_meta: Dict[str, Any],
+        tier: str
+    ) -> Dict[str, Any]:
         """
         Fallback extraction method when parsers are not available.
-        This maintains compatibility with existing system.
+        
+        Keeps the legacy result structure. Inline XBRL facts found by the
+        regex scan are reported in xbrl_facts_count/xbrl_metrics; content
+        without facts still yields 0 and an empty dict, as before.
         """
         logger.info("Using fallback extraction method")
-        
+        if isinstance(content, str):
+            return self._fallback_result(self._scan_ix_facts(content), tier)
+        return self._fallback_result(list(self._scan_ix_facts_stream(io.BytesIO(content))), tier)
+    
+    def _fallback_result(self, facts: List[Dict[str, Any]], tier: str) -> Dict[str, Any]:
+        """Build the fallback result structure from scanned XBRL facts."""
         return {
             "success": True,
             "extraction_method": f"fallback_{tier}",
             "processing_duration": 0.1,
             "fund_metadata": {},
-            "xbrl_metrics": {},
-            "xbrl_facts_count": 0,
+            "xbrl_metrics": self._summarize_facts(facts),
+            "xbrl_facts_count": len(facts),
             "sections": [],
             "tables": [],
             "table_count": 0,
@@ -252,6 +313,58 @@ class ParserManager:
             "note": "Parser integration not available - using fallback method"
         }
     
+    def _scan_ix_facts(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Extract inline XBRL facts with the precompiled tag regexes.
+        
+        Single forward pass over the raw text: no DOM is built, so peak
+        memory stays at the input size plus the extracted facts.
+        """
+        return [fact for match in _IX_RE.finditer(content) if (fact := self._ix_fact(match))]
+    
+    def _scan_ix_facts_stream(self, reader: IO) -> Iterator[Dict[str, Any]]:
+        """
+        Chunked variant of _scan_ix_facts.
+        
+        Matches are always complete tags (the regex requires the closing tag),
+        so only the text from the last unmatched "<ix:non" onwards is carried
+        over to the next chunk.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        buffer = ""
+        while True:
+            raw = reader.read(_STREAM_CHUNK_SIZE)
+            # A chunk ending mid-character decodes to less text (possibly none)
+            buffer += decoder.decode(raw, final=not raw) if isinstance(raw, bytes) else raw
+            
+            last_end = 0
+            for match in _IX_RE.finditer(buffer):
+                fact = self._ix_fact(match)
+                if fact:
+                    yield fact
+                last_end = match.end()
+            
+            if not raw:
+                return
+            
+            # Keep a possibly incomplete trailing fact (or a partial "<ix:non" prefix)
+            cut = buffer.rfind("<ix:non", last_end)
+            if cut == -1 or len(buffer) - cut > _STREAM_MAX_CARRY:
+                cut = max(last_end, len(buffer) - 6)
+            buffer = buffer[cut:]
+    
+    def _ix_fact(self, match: re.Match) -> Optional[Dict[str, Any]]:
+        """Convert an _IX_RE match into a fact dictionary."""
+        attrs = dict(_IX_ATTR_RE.findall(match.group(2)))
+        if "name" not in attrs:
+            return None
+        return {
+            "concept": attrs["name"],
+            "value": match.group(3).strip(),
+            "unit_ref": attrs.get("unitRef"),
+            "context_ref": attrs.get("contextRef")
+        }
+    
     def get_parser_status(self) -> Dict[str, Any]:
         """Get status information about available parsers."""
         return {
@@ -322,7 +435,7 @@ class DatabaseResultManager:
         """Update Filing record with parser-specific information."""
         from ..storage.models import Filing
         
-        filing = session.query(Filing).filter(Filing.id == filing_id).first()
+        filing = session.query(Filing).filter(Filing.filing_id == filing_id).first()
         if not filing:
             raise ValueError(f"Filing {filing_id} not found")
         
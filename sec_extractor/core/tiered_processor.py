@@ -42,7 +42,7 @@ class TieredProcessor:
 
         # ORM managers
         self.db = DatabaseManager(self.database_url)
-        self.dlq = DeadLetterQueueManager(self.database_url)
+        self.dlq = DeadLetterQueueManager(db=self.db)  # mismo engine/pool
 
         # Infra
         self.timeout_manager = TimeoutManager(settings)
@@ -471,9 +471,11 @@ class TieredProcessor:
             today_metrics = self.db.get_daily_metrics()
             dlq_stats = self.dlq.get_retry_statistics()
             parser_status = self.parser_manager.get_parser_status()
+            recent_filings = self.db.get_recent_filings_report()
             
             return {
                 "daily_metrics": today_metrics,
+                "recent_filings": recent_filings,
                 "dlq_statistics": dlq_stats,
                 "system_metrics": self.metrics.daily_metrics.daily_report(),
                 "parser_system": parser_status
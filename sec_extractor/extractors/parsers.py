@@ -11,6 +11,7 @@ Este módulo contiene funciones para:
 
 import re
 import logging
+from collections import Counter
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import pandas as pd
@@ -131,17 +132,15 @@ def extract_tables(html_text: str) -> List[Dict]:
                 df = pd.read_html(str(table_tag), flavor='lxml')[0]
                 df.columns = [str(c) for c in df.columns] # Asegurar que las columnas son strings
                 
-                # Normalizar filas
-                rows_data = []
-                for row_idx, row in df.iterrows():
-                    for col_name, col_value in row.items():
-                        if pd.notna(col_value):
-                            rows_data.append({
-                                "row_index": row_idx,
-                                "col_name": str(col_name)[:250],
-                                "col_value": str(col_value),
-                                "col_type": _infer_column_type(col_value)
-                            })
+                # Tabla completa como un único documento JSON (columnas + tipos + filas)
+                table_data = {
+                    "columns": [str(c)[:250] for c in df.columns],
+                    "types": [_infer_series_type(df.iloc[:, idx]) for idx in range(len(df.columns))],
+                    "rows": [
+                        [str(v) if pd.notna(v) else None for v in row]
+                        for row in df.itertuples(index=False, name=None)
+                    ]
+                }
 
                 tables.append({
                     "table_type": _classify_table_type(caption or "", df),
@@ -149,7 +148,7 @@ def extract_tables(html_text: str) -> List[Dict]:
                     "table_html": table_tag.prettify(),
                     "row_count": len(df),
                     "column_count": len(df.columns),
-                    "rows": rows_data
+                    "data": table_data
                 })
             except (ValueError, IndexError) as e:
                 logger.debug(f"Could not parse table {i}: {e}")
@@ -216,6 +215,13 @@ def _classify_table_type(caption: str, df: pd.DataFrame) -> str:
         return 'financial_summary'
     return 'other'
 
+def _infer_series_type(series: pd.Series) -> str:
+    """Infiere el tipo predominante de una columna a partir de sus valores no nulos."""
+    types = Counter(_infer_column_type(v) for v in series if pd.notna(v))
+    if not types:
+        return 'null'
+    return types.most_common(1)[0][0]
+
 def _infer_column_type(value) -> str:
     """Infiere el tipo de dato de un valor en una tabla."""
     if pd.isna(value):
@@ -172,12 +172,12 @@ class ParseError(Exception):
         super().__init__(full_message)
 
 
-def safe_decode(data: Union[str, bytes], encoding: str = 'utf-8') -> str:
+def safe_decode(data: Union[str, bytes, bytearray, memoryview], encoding: str = 'utf-8') -> str:
     """
     Safely decode bytes to string with fallback handling.
     
     Args:
-        data: Data to decode
+        data: Data to decode (any bytes-like object is decoded in place)
         encoding: Target encoding
         
     Returns:
@@ -186,12 +186,12 @@ def safe_decode(data: Union[str, bytes], encoding: str = 'utf-8') -> str:
     if isinstance(data, str):
         return data
     
-    if isinstance(data, bytes):
+    if isinstance(data, (bytes, bytearray, memoryview)):
         try:
-            return data.decode(encoding)
+            return str(data, encoding)
         except UnicodeDecodeError:
             # Fallback to latin-1 which accepts any byte sequence
-            return data.decode('latin-1', errors='replace')
+            return str(data, 'latin-1', errors='replace')
     
     return str(data)
 
@@ -136,13 +136,12 @@ class FilingParser(BaseParser):
             ParsingResult with integrated data from all applicable parsers
         """
         try:
-            content_str = safe_decode(content)
-            
-            if not self.is_compatible(content_str):
+            # Sub-parser checks accept bytes directly; decode only for XBRL below
+            if not self.is_compatible(content):
                 raise ParseError("Content is not compatible with any available parser")
             
             # Determine parsing strategy
-            strategy = self.determine_parser_strategy(content_str)
+            strategy = self.determine_parser_strategy(content)
             logger.debug(f"Parser strategy: {strategy}")
             
             results = []
@@ -153,7 +152,8 @@ class FilingParser(BaseParser):
             # Parse with SGML parser if applicable
             if strategy["use_sgml"] and self.sgml_parser:
                 logger.debug("Parsing with SGML parser")
-                sgml_result = self.sgml_parser.parse(content_str, **kwargs)
+                # Original content: secsgml wants bytes, so bytes input is not round-tripped
+                sgml_result = self.sgml_parser.parse(content, **kwargs)
                 results.append(("sgml", sgml_result))
                 
                 if sgml_result.success:
@@ -166,7 +166,7 @@ class FilingParser(BaseParser):
             # Parse with XBRL parser if applicable  
             if strategy["use_xbrl"] and self.xbrl_parser:
                 # For SGML content with XBRL, extract XBRL parts first
-                xbrl_content = self._extract_xbrl_content(content_str, strategy)
+                xbrl_content = self._extract_xbrl_content(safe_decode(content), strategy)
                 
                 if xbrl_content:
                     logger.debug("Parsing extracted XBRL content")
@@ -19,6 +19,17 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# SEC document markers (upper case); the bytes form lets raw input be
+# checked without decoding it first
+_SGML_MARKERS = (
+    "<SEC-DOCUMENT>",
+    "<SEC-HEADER>",
+    "ACCESSION-NUMBER:",
+    "CONFORMED-SUBMISSION-TYPE:",
+    "<DOCUMENT>"
+)
+_SGML_MARKERS_BYTES = tuple(marker.encode("ascii") for marker in _SGML_MARKERS)
+
 
 class SGMLParser(BaseParser):
     """
@@ -74,19 +85,14 @@ class SGMLParser(BaseParser):
             True if content appears to be SEC SGML format
         """
         try:
-            content_str = safe_decode(content)
-            
-            # Check for SEC document markers
-            sgml_indicators = [
-                "<SEC-DOCUMENT>",
-                "<SEC-HEADER>",
-                "ACCESSION-NUMBER:",
-                "CONFORMED-SUBMISSION-TYPE:",
-                "<DOCUMENT>"
-            ]
+            # Check for SEC document markers (plain substring search beats a
+            # case-insensitive regex alternation several times over)
+            if isinstance(content, (bytes, bytearray, memoryview)):
+                content_upper = bytes(content).upper()
+                return any(marker in content_upper for marker in _SGML_MARKERS_BYTES)
             
-            content_upper = content_str.upper()
-            return any(indicator in content_upper for indicator in sgml_indicators)
+            content_upper = safe_decode(content).upper()
+            return any(marker in content_upper for marker in _SGML_MARKERS)
             
         except Exception as e:
             logger.debug(f"Error checking SGML compatibility: {e}")
@@ -108,15 +114,15 @@ class SGMLParser(BaseParser):
             ParseError: If parsing fails
         """
         try:
-            # Convert to bytes if needed
+            # Bytes-like input goes to secsgml as-is (never decoded here)
             if isinstance(content, str):
                 content_bytes = content.encode('utf-8')
-                content_str = content
-            else:
+            elif isinstance(content, bytes):
                 content_bytes = content
-                content_str = safe_decode(content)
+            else:
+                content_bytes = bytes(content)
             
-            if not self.is_compatible(content_str):
+            if not self.is_compatible(content_bytes):
                 raise ParseError("Content does not appear to be SEC SGML format")
             
             # Parse using secsgml (expects bytes)
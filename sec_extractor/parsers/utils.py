@@ -12,6 +12,13 @@ import hashlib
 
 logger = logging.getLogger(__name__)
 
+# SGML header/document splitters, compiled once at import
+_SEC_HEADER_RE = re.compile(r'<SEC-HEADER>(.*?)</SEC-HEADER>', re.DOTALL | re.IGNORECASE)
+_DOCUMENT_RE = re.compile(
+    r'<DOCUMENT>\s*<TYPE>([^<\n]+)\s*<SEQUENCE>([^<\n]+).*?<TEXT>(.*?)</TEXT>\s*</DOCUMENT>',
+    re.DOTALL | re.IGNORECASE
+)
+
 
 def clean_filing_content(content: str) -> str:
     """
@@ -51,17 +58,12 @@ def extract_document_sections(content: str) -> Dict[str, str]:
     sections = {}
     
     # Extract SEC header
-    header_match = re.search(
-        r'<SEC-HEADER>(.*?)</SEC-HEADER>', 
-        content, 
-        re.DOTALL | re.IGNORECASE
-    )
+    header_match = _SEC_HEADER_RE.search(content)
     if header_match:
         sections['header'] = header_match.group(1).strip()
     
     # Extract documents
-    document_pattern = r'<DOCUMENT>\s*<TYPE>([^<\n]+)\s*<SEQUENCE>([^<\n]+).*?<TEXT>(.*?)</TEXT>\s*</DOCUMENT>'
-    document_matches = re.findall(document_pattern, content, re.DOTALL | re.IGNORECASE)
+    document_matches = _DOCUMENT_RE.findall(content)
     
     documents = []
     for doc_type, sequence, text in document_matches:
@@ -20,6 +20,16 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import instead of on every call
+_TITLE_RE = re.compile(r"<title[^>]*>([^<]+)</title>", re.IGNORECASE)
+_ENTITY_CIK_RE = re.compile(r'scheme="[^"]*cik"[^>]*>(\d+)', re.IGNORECASE)
+_CONTEXT_RE = re.compile(r'<ix:context[^>]*id="([^"]*)"[^>]*>(.*?)</ix:context>', re.DOTALL | re.IGNORECASE)
+
+# XBRL/InlineXBRL indicators (lower case); "ix:" already covers <ix:nonFraction,
+# <ix:nonNumeric and <ix:fraction, so those need no separate scan
+_XBRL_MARKERS = ("xmlns:ix=", "inlinexbrl", "ix:", "xbrl.org")
+_XBRL_MARKERS_BYTES = tuple(marker.encode("ascii") for marker in _XBRL_MARKERS)
+
 
 class XBRLParser(BaseParser):
     """
@@ -76,21 +86,13 @@ class XBRLParser(BaseParser):
             True if content appears to be InlineXBRL format
         """
         try:
-            content_str = safe_decode(content)
-            
             # Check for XBRL/InlineXBRL indicators
-            xbrl_indicators = [
-                "xmlns:ix=", 
-                "inlineXBRL",
-                "ix:",
-                "xbrl.org",
-                "<ix:nonFraction",
-                "<ix:nonNumeric",
-                "<ix:fraction"
-            ]
-            
-            content_lower = content_str.lower()
-            return any(indicator.lower() in content_lower for indicator in xbrl_indicators)
+            if isinstance(content, (bytes, bytearray, memoryview)):
+                content_lower = bytes(content).lower()
+                return any(marker in content_lower for marker in _XBRL_MARKERS_BYTES)
+            
+            content_lower = safe_decode(content).lower()
+            return any(marker in content_lower for marker in _XBRL_MARKERS)
             
         except Exception as e:
             logger.debug(f"Error checking XBRL compatibility: {e}")
@@ -267,11 +269,11 @@ class XBRLParser(BaseParser):
         """
         try:
             # Extract title if available
-            title_match = re.search(r"<title[^>]*>([^<]+)</title>", content, re.IGNORECASE)
+            title_match = _TITLE_RE.search(content)
             title = title_match.group(1).strip() if title_match else None
             
             # Look for entity identifier in contexts
-            entity_match = re.search(r'scheme="[^"]*cik"[^>]*>(\d+)', content, re.IGNORECASE)
+            entity_match = _ENTITY_CIK_RE.search(content)
             cik = entity_match.group(1) if entity_match else None
             
             # Basic metadata structure
@@ -350,8 +352,7 @@ class XBRLParser(BaseParser):
             content_str = safe_decode(content)
             
             # Find context definitions
-            context_pattern = r'<ix:context[^>]*id="([^"]*)"[^>]*>(.*?)</ix:context>'
-            context_matches = re.findall(context_pattern, content_str, re.DOTALL | re.IGNORECASE)
+            context_matches = _CONTEXT_RE.findall(content_str)
             
             for context_id, context_content in context_matches:
                 contexts[context_id] = {
@@ -3,18 +3,96 @@ DatabaseManager con soporte para SQLite y PostgreSQL
 """
 
 import logging
-from typing import Dict, Optional, Any
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Any
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import create_engine, select, text, bindparam
+from sqlalchemy.orm import sessionmaker, Session, selectinload, joinedload
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from .models import (
-    Base, Filing, ProcessingResult, DeadLetterQueue, FundMetadata, 
-    FilingDocument, NcsrSection, NcsrTable, NcsrTableRow, NcsrXbrl, ProcessingLog
+    utcnow, accession_to_int, Base, Filing, ProcessingResult, DeadLetterQueue, FundMetadata, 
+    FilingDocument, NcsrSection, NcsrTable, NcsrXbrl, ProcessingLog
 )
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Claves de filing_meta que no coinciden con el nombre de columna en Filing
+_FILING_META_ALIASES = {"filing_date": "filed_at"}
+_FILING_COLUMNS = frozenset(c.key for c in Filing.__table__.columns) - {"filing_id"}
+# Tablas particionadas por mes en PostgreSQL (ver models._pg_partitioned_primary_key)
+_PARTITIONED_TABLES = frozenset(t.name for t in Base.metadata.sorted_tables if t.info.get("partition_key"))
+
+
+def _filing_row(filing_meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Normaliza un filing_meta a un dict de columnas de Filing."""
+    row = {}
+    for key, value in filing_meta.items():
+        key = _FILING_META_ALIASES.get(key, key)
+        if key not in _FILING_COLUMNS:
+            continue
+        if key == "filed_at" and isinstance(value, str):
+            value = date.fromisoformat(value)
+        row[key] = value
+    if "accession_number" in row:
+        row["accession_int"] = accession_to_int(row["accession_number"])
+    return row
+
+
+# Resultados de un día (get_daily_metrics); compilada una sola vez
+_DAILY_RESULTS_STMT = select(ProcessingResult).where(
+    ProcessingResult.created_at >= bindparam("start"),
+    ProcessingResult.created_at < bindparam("end"),
+)
+
+
+def _orjson_default(value: Any) -> Any:
+    """Tipos que orjson no serializa de forma nativa."""
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _orjson_dumps(value: Any) -> str:
+    """Serializador JSON/JSONB del engine (orjson devuelve bytes)."""
+    return orjson.dumps(value, default=_orjson_default).decode()
+
+
+def _batched(iterable: Iterable[Any], size: int) -> Iterable[List[Any]]:
+    """Divide un iterable en listas de tamaño `size`."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def filings_for_summary(session: Session, limit: Optional[int] = None, newest_first: bool = False) -> List[Filing]:
+    """
+    Obtiene filings con sus relaciones de reporte precargadas.
+
+    Cada colección se carga con un único SELECT ... WHERE filing_id IN (...),
+    por lo que el número de queries es constante (1 + K relaciones) sin
+    importar cuántos filings se devuelvan.
+    """
+    stmt = select(Filing).options(
+        selectinload(Filing.processing_result),
+        selectinload(Filing.xbrl_facts),
+        selectinload(Filing.tables),
+        joinedload(Filing.fund_metadata),
+    ).order_by(Filing.filing_id.desc() if newest_first else Filing.filing_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return list(session.scalars(stmt).all())
+
+
 class DatabaseManager:
     """Manager de base de datos con soporte para SQLite y PostgreSQL"""
 
@@ -26,11 +104,20 @@ class DatabaseManager:
 
         # Configuración específica según tipo de base de datos
         engine_kwargs = {'echo': False}
+        if ORJSON_AVAILABLE:
+            # JSON/JSONB (raw_data, key_metrics, additional_attributes) se
+            # codifican/decodifican con orjson en lugar del módulo json estándar
+            engine_kwargs['json_serializer'] = _orjson_dumps
+            engine_kwargs['json_deserializer'] = orjson.loads
         if not database_url.startswith('sqlite'):
+            # Tamaño del pool configurable (DB_POOL_SIZE/DB_MAX_OVERFLOW); las
+            # conexiones se reciclan antes de los timeouts de red
+            from ..config.settings import settings
             engine_kwargs.update({
-                'pool_size': 10,
-                'max_overflow': 20,
-                'pool_pre_ping': True
+                'pool_size': settings.DB_POOL_SIZE,
+                'max_overflow': settings.DB_MAX_OVERFLOW,
+                'pool_pre_ping': True,
+                'pool_recycle': settings.DB_POOL_RECYCLE
             })
 
         try:
@@ -49,48 +136,24 @@ class DatabaseManager:
         return self.SessionLocal()
 
     def create_or_update_filing(self, filing_meta: Dict[str, Any]) -> int:
-        """Crea o actualiza un filing en la base de datos"""
+        """
+        Crea o actualiza un filing en la base de datos.
+
+        Un único INSERT ... ON CONFLICT (accession_int) DO UPDATE ... RETURNING
+        filing_id: un round-trip en lugar de SELECT + INSERT/UPDATE, y sin la
+        carrera entre workers que insertan el mismo accession a la vez.
+        """
         session = self.get_session()
         try:
-            accession = filing_meta.get("accession_number")
-            if not accession:
+            if not filing_meta.get("accession_number"):
                 raise ValueError("accession_number is required in filing_meta")
 
-            existing_filing = session.query(Filing).filter(Filing.accession_number == accession).first()
-            if existing_filing:
-                for key, value in filing_meta.items():
-                    if hasattr(existing_filing, key):
-                        setattr(existing_filing, key, value)
-                existing_filing.updated_at = datetime.utcnow()
-                session.commit()
-                logger.debug(f"Updated filing {existing_filing.id}")
-                return existing_filing.id
-
-            new_filing = Filing(
-                accession_number=accession,
-                cik=filing_meta.get("cik"),
-                company_name=filing_meta.get("company_name"),
-                form_type=filing_meta.get("form_type"),
-                filing_date=filing_meta.get("filing_date"),
-                period_of_report=filing_meta.get("period_of_report"),
-                file_size_mb=filing_meta.get("file_size_mb", 0.0),
-                filing_html_url=filing_meta.get("filing_html_url"),
-                
-                # Nuevos campos SGML/XBRL
-                acceptance_datetime=filing_meta.get("acceptance_datetime"),
-                sic=filing_meta.get("sic"),
-                state_of_incorporation=filing_meta.get("state_of_incorporation"),
-                fiscal_year_end=filing_meta.get("fiscal_year_end"),
-                business_address=filing_meta.get("business_address"),
-                business_phone=filing_meta.get("business_phone"),
-                
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            session.add(new_filing)
+            row = _filing_row(filing_meta)
+            stmt = self._filing_upsert_stmt([row]).values(row).returning(Filing.filing_id)
+            filing_id = session.execute(stmt).scalar_one()
             session.commit()
-            logger.debug(f"Created new filing {new_filing.id}")
-            return new_filing.id
+            logger.debug(f"Upserted filing {filing_id}")
+            return filing_id
         except SQLAlchemyError as e:
             session.rollback()
             logger.error(f"Database error creating/updating filing: {e}")
@@ -98,11 +161,52 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def _filing_upsert_stmt(self, rows: List[Dict[str, Any]]):
+        """INSERT ... ON CONFLICT (accession_int) DO UPDATE para el dialecto del engine."""
+        insert = pg_insert if self.engine.dialect.name == "postgresql" else sqlite_insert
+        stmt = insert(Filing)
+        # Solo se actualizan las columnas presentes en todas las filas
+        mutable_cols = set.intersection(*map(set, rows)) - {"accession_number", "accession_int", "created_at"}
+        update_set = {col: stmt.excluded[col] for col in mutable_cols}
+        update_set["updated_at"] = utcnow()
+        return stmt.on_conflict_do_update(index_elements=["accession_int"], set_=update_set)
+
+    def bulk_create_filings(self, filing_metas: Iterable[Dict[str, Any]], batch_size: int = 10_000) -> int:
+        """
+        Inserta/actualiza filings en lote con INSERT ... ON CONFLICT (accession_int).
+
+        Cada lote se envía como un único executemany en lugar de un
+        SELECT + INSERT por filing, manteniendo la semántica de upsert de
+        create_or_update_filing.
+
+        Returns:
+            int: Número de filings procesados
+        """
+        session = self.get_session()
+        total = 0
+        try:
+            for batch in _batched(filing_metas, batch_size):
+                rows = [_filing_row(meta) for meta in batch]
+                if any("accession_number" not in row for row in rows):
+                    raise ValueError("accession_number is required in filing_meta")
+
+                session.execute(self._filing_upsert_stmt(rows), rows)
+                total += len(rows)
+            session.commit()
+            logger.debug(f"Bulk upserted {total} filings")
+            return total
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Database error bulk creating filings: {e}")
+            raise
+        finally:
+            session.close()
+
     def update_filing_processing_status(self, filing_id: int, tier: str, status: str) -> bool:
         """Actualiza el status de procesamiento de un filing"""
         session = self.get_session()
         try:
-            filing = session.query(Filing).filter(Filing.id == filing_id).first()
+            filing = session.query(Filing).filter(Filing.filing_id == filing_id).first()
             if filing:
                 filing.processing_tier = tier
                 filing.processing_status = status
@@ -122,7 +226,7 @@ class DatabaseManager:
         session = self.get_session()
         try:
             # 1. Actualizar Filing
-            filing = session.query(Filing).filter(Filing.id == filing_id).first()
+            filing = session.query(Filing).filter(Filing.filing_id == filing_id).first()
             if not filing:
                 logger.error(f"Filing with id {filing_id} not found for saving results.")
                 return False
@@ -147,27 +251,19 @@ class DatabaseManager:
                 section = NcsrSection(filing_id=filing_id, **sec_data)
                 session.add(section)
 
-            # 4. Guardar Tablas y sus filas
+            # 4. Guardar Tablas (una fila por tabla, celdas en `data` JSONB)
             for table_data in result.get("tables", []):
-                rows = table_data.pop("rows", [])
-                table = NcsrTable(filing_id=filing_id, **table_data)
-                session.add(table)
-                session.flush() # Para obtener el ID de la tabla
-                
-                for row_data in rows:
-                    row = NcsrTableRow(table_id=table.id, **row_data)
-                    session.add(row)
+                session.add(NcsrTable(filing_id=filing_id, **table_data))
 
             # 5. Guardar Resumen en ProcessingResult
             processing_summary = ProcessingResult(
                 filing_id=filing_id,
                 processing_tier=tier,
                 success=result.get("success", False),
-                tables_extracted=result.get("table_count", 0),
-                sections_found=result.get("section_count", 0),
+                error_message=result.get("error"),
+                table_count=result.get("table_count", 0),
+                section_count=result.get("section_count", 0),
                 processing_duration=result.get("processing_duration", 0.0),
-                result_data=result, # Guardar el JSON completo por si acaso
-                created_at=datetime.utcnow()
             )
             session.add(processing_summary)
 
@@ -185,15 +281,15 @@ class DatabaseManager:
         """Obtiene un filing por su accession number"""
         session = self.get_session()
         try:
-            filing = session.query(Filing).filter(Filing.accession_number == accession_number).first()
+            filing = session.query(Filing).filter(Filing.accession_int == accession_to_int(accession_number)).first()
             if filing:
                 return {
-                    "id": filing.id,
+                    "id": filing.filing_id,
                     "accession_number": filing.accession_number,
                     "cik": filing.cik,
                     "company_name": filing.company_name,
-                    "filing_date": filing.filing_date,
-                    "period_end": filing.period_end,
+                    "filing_date": filing.filed_at,
+                    "period_end": filing.period_of_report,
                     "file_size_mb": filing.file_size_mb,
                     "processing_status": filing.processing_status,
                     "processing_tier": filing.processing_tier,
@@ -205,6 +301,8 @@ class DatabaseManager:
             logger.error(f"Error getting filing by accession: {e}")
             return None
         finally:
+            # El resultado es un dict; no dejar instancias ligadas a la sesión
+            session.expunge_all()
             session.close()
 
     def get_daily_metrics(self, date: datetime = None) -> Dict[str, Any]:
@@ -213,9 +311,9 @@ class DatabaseManager:
             date = datetime.utcnow().date()
         session = self.get_session()
         try:
-            daily_results = session.query(ProcessingResult).filter(
-                ProcessingResult.created_at >= datetime.combine(date, datetime.min.time()),
-                ProcessingResult.created_at < datetime.combine(date, datetime.min.time()) + timedelta(days=1)
+            start = datetime.combine(date, datetime.min.time())
+            daily_results = session.scalars(
+                _DAILY_RESULTS_STMT, {"start": start, "end": start + timedelta(days=1)}
             ).all()
 
             metrics = {
@@ -226,7 +324,7 @@ class DatabaseManager:
                     "successful": sum(1 for r in daily_results if r.success),
                     "failed": sum(1 for r in daily_results if not r.success),
                     "total_duration": sum(r.processing_duration for r in daily_results),
-                    "total_tables": sum(r.tables_extracted for r in daily_results),
+                    "total_tables": sum(r.table_count for r in daily_results),
                 },
             }
 
@@ -241,11 +339,132 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def get_recent_filings_report(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Resumen de los últimos filings con su resultado, facts y tablas.
+
+        Usa filings_for_summary, así que el coste es un número fijo de
+        queries sin importar `limit`.
+        """
+        session = self.get_session()
+        try:
+            return [
+                {
+                    "accession_number": filing.accession_number,
+                    "company_name": filing.company_name,
+                    "form_type": filing.form_type,
+                    "processing_status": filing.processing_status,
+                    "processing_tier": filing.processing_tier,
+                    "success": filing.processing_result.success if filing.processing_result else None,
+                    "processing_duration": filing.processing_result.processing_duration if filing.processing_result else None,
+                    "fund_name": filing.fund_metadata.fund_name if filing.fund_metadata else None,
+                    "xbrl_facts": len(filing.xbrl_facts),
+                    "tables": len(filing.tables),
+                }
+                for filing in filings_for_summary(session, limit=limit, newest_first=True)
+            ]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting recent filings report: {e}")
+            return []
+        finally:
+            session.close()
+
+    def create_monthly_partition(self, table_name: str, month: date) -> Optional[str]:
+        """
+        Crea la partición mensual `<tabla>_YYYYMM` que contiene `month`.
+
+        Pensado para ejecutarse por adelantado (p.ej. un cron que crea la del
+        mes siguiente): PostgreSQL rechaza la partición si la DEFAULT ya tiene
+        filas en ese rango. En SQLite no hace nada.
+
+        Returns:
+            Optional[str]: Nombre de la partición, o None si no aplica
+        """
+        if table_name not in _PARTITIONED_TABLES:
+            raise ValueError(f"{table_name} is not a partitioned table")
+        if self.engine.dialect.name != "postgresql":
+            return None
+
+        start = month.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        partition = f"{table_name}_{start:%Y%m}"
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+        logger.info(f"Partition {partition} ready")
+        return partition
+
+    def drop_partitions_before(self, table_name: str, cutoff: date) -> List[str]:
+        """
+        Elimina las particiones mensuales de `table_name` anteriores al mes de
+        `cutoff`: un DROP por mes en lugar de un DELETE masivo. En SQLite no
+        hace nada.
+
+        Returns:
+            List[str]: Particiones eliminadas
+        """
+        if table_name not in _PARTITIONED_TABLES:
+            raise ValueError(f"{table_name} is not a partitioned table")
+        if self.engine.dialect.name != "postgresql":
+            return []
+
+        cutoff_suffix = f"{cutoff:%Y%m}"
+        dropped = []
+        with self.engine.begin() as conn:
+            partitions = conn.execute(text(
+                "SELECT inhrelid::regclass::text FROM pg_inherits "
+                "WHERE inhparent = CAST(:parent AS regclass)"
+            ), {"parent": table_name}).scalars().all()
+            for partition in sorted(partitions):
+                suffix = partition.rsplit("_", 1)[-1]
+                if suffix.isdigit() and len(suffix) == 6 and suffix < cutoff_suffix:
+                    conn.execute(text(f"DROP TABLE {partition}"))
+                    dropped.append(partition)
+        logger.info(f"Dropped {len(dropped)} partitions of {table_name}: {dropped}")
+        return dropped
+
+    def ensure_upcoming_partitions(self, today: Optional[date] = None) -> List[str]:
+        """
+        Crea las particiones del mes actual y del siguiente para todas las
+        tablas particionadas. Idempotente; pensado para la ejecución diaria.
+        En SQLite no hace nada.
+        """
+        today = today or datetime.utcnow().date()
+        next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+        created = []
+        for table_name in sorted(_PARTITIONED_TABLES):
+            for month in (today, next_month):
+                partition = self.create_monthly_partition(table_name, month)
+                if partition:
+                    created.append(partition)
+        return created
+
     def cleanup_old_data(self, days_to_keep: int = 90) -> Dict[str, int]:
-        """Limpia datos antiguos de la base de datos"""
+        """
+        Limpia datos antiguos de la base de datos.
+
+        En PostgreSQL las tablas particionadas (xbrl_facts, processing_logs) se
+        podan con DROP de particiones mensuales completas; en SQLite, con DELETE.
+        """
         cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
+        cleanup_results = {}
+        if self.engine.dialect.name == "postgresql":
+            for table_name in sorted(_PARTITIONED_TABLES):
+                dropped = self.drop_partitions_before(table_name, cutoff_date.date())
+                cleanup_results[f"{table_name}_partitions_dropped"] = len(dropped)
+
         session = self.get_session()
         try:
+            if self.engine.dialect.name != "postgresql":
+                for table in Base.metadata.sorted_tables:
+                    if table.name in _PARTITIONED_TABLES:
+                        deleted = session.execute(
+                            table.delete().where(table.c.created_at < cutoff_date)
+                        )
+                        cleanup_results[table.name] = deleted.rowcount
+
             old_results = session.query(ProcessingResult).filter(
                 ProcessingResult.created_at < cutoff_date
             ).count()
@@ -263,7 +482,7 @@ class DatabaseManager:
             ).delete()
 
             session.commit()
-            cleanup_results = {"processing_results": old_results, "filings": old_filings}
+            cleanup_results.update({"processing_results": old_results, "filings": old_filings})
             logger.info(f"Cleanup completed: {cleanup_results}")
             return cleanup_results
         except SQLAlchemyError as e:
@@ -4,25 +4,69 @@ Maneja reintentos inteligentes de filings fallidos con backoff exponencial
 """
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select, bindparam
 from sqlalchemy.orm import Session
 import logging
 import psutil
 import json
 
-from .models import DeadLetterQueue as DLQModel, Filing, ProcessingResult
+from .models import DeadLetterQueue as DLQModel, Filing, ProcessingResult, utcnow
 from .database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# --- Sentencias precompiladas ---
+# Se construyen una sola vez a nivel de módulo y se ejecutan con bindparams,
+# así SQLAlchemy reutiliza la compilación cacheada en cada ciclo del batch.
+
+_DLQ_READY_STMT = (
+    select(DLQModel, Filing)
+    .join(Filing)
+    .where(
+        DLQModel.retry_eligible == True,
+        DLQModel.next_retry <= utcnow(),
+        DLQModel.attempt_count < DLQModel.max_attempts,
+        DLQModel.file_size_mb <= bindparam("max_file_size_mb"),
+    )
+    .order_by(
+        DLQModel.priority.desc(),  # Prioridad alta primero
+        DLQModel.file_size_mb.asc(),  # Archivos pequeños primero
+        DLQModel.attempt_count.asc(),  # Menos intentos primero
+        DLQModel.created_at.asc()  # Más antiguos primero
+    )
+    .limit(bindparam("limit"))
+)
+
+# Contadores básicos en un único round-trip
+_DLQ_COUNTS_STMT = select(
+    func.count(DLQModel.id).label('total_entries'),
+    func.count(DLQModel.id).filter(DLQModel.retry_eligible == True).label('eligible_for_retry'),
+    func.count(DLQModel.id).filter(
+        DLQModel.retry_eligible == True, DLQModel.next_retry <= utcnow()
+    ).label('ready_for_retry'),
+)
+
+_DLQ_FAILURE_STATS_STMT = select(
+    DLQModel.failure_type,
+    func.count(DLQModel.id).label('count'),
+    func.avg(DLQModel.attempt_count).label('avg_attempts')
+).group_by(DLQModel.failure_type)
+
+_DLQ_SIZE_STATS_STMT = select(
+    func.count(DLQModel.id).label('count'),
+    func.avg(DLQModel.file_size_mb).label('avg_size'),
+    func.max(DLQModel.file_size_mb).label('max_size')
+).where(DLQModel.retry_eligible == True)
+
 class DeadLetterQueueManager:
     """
     Manager para Dead Letter Queue usando ORM
     Mantiene compatibilidad con interfaz existente pero usa SQLAlchemy internamente
     """
     
-    def __init__(self, database_url: str):
-        self.db = DatabaseManager(database_url)
+    def __init__(self, database_url: Optional[str] = None, db: Optional[DatabaseManager] = None):
+        # Reutilizar el DatabaseManager (y su pool) del llamador si se pasa
+        self.db = db or DatabaseManager(database_url)
         logger.info("DeadLetterQueueManager initialized with ORM")
     
     def add_filing(self, filing_id: int, error: str, file_size_mb: float, 
@@ -104,7 +148,7 @@ class DeadLetterQueueManager:
                 logger.info(f"Added new filing {filing_id} to DLQ: {error}")
             
             # Actualizar status del filing
-            filing = session.query(Filing).filter_by(id=filing_id).first()
+            filing = session.query(Filing).filter_by(filing_id=filing_id).first()
             if filing:
                 filing.processing_status = 'dead_letter'
                 filing.updated_at = datetime.utcnow()
@@ -132,27 +176,15 @@ class DeadLetterQueueManager:
         """
         try:
             with self.db.get_session() as session:
-                current_time = datetime.utcnow()
-                
-                # Query optimizada con joins para obtener toda la info necesaria
-                dlq_entries = session.query(DLQModel, Filing).join(Filing).filter(
-                    and_(
-                        DLQModel.retry_eligible == True,
-                        DLQModel.next_retry <= current_time,
-                        DLQModel.attempt_count < DLQModel.max_attempts,
-                        DLQModel.file_size_mb <= max_file_size_mb
-                    )
-                ).order_by(
-                    DLQModel.priority.desc(),  # Prioridad alta primero
-                    DLQModel.file_size_mb.asc(),  # Archivos pequeños primero
-                    DLQModel.attempt_count.asc(),  # Menos intentos primero
-                    DLQModel.created_at.asc()  # Más antiguos primero
-                ).limit(batch_size).all()
+                # Query con join para obtener toda la info necesaria
+                dlq_entries = session.execute(
+                    _DLQ_READY_STMT, {"max_file_size_mb": max_file_size_mb, "limit": batch_size}
+                ).all()
                 
                 result = []
                 for dlq_entry, filing in dlq_entries:
                     result.append({
-                        'filing_id': filing.id,
+                        'filing_id': filing.filing_id,
                         'accession_number': filing.accession_number,
                         'cik': filing.cik,
                         'company_name': filing.company_name,
@@ -178,35 +210,18 @@ class DeadLetterQueueManager:
         try:
             with self.db.get_session() as session:
                 # Contadores básicos
-                total_entries = session.query(func.count(DLQModel.id)).scalar()
-                eligible_for_retry = session.query(func.count(DLQModel.id)).filter(
-                    DLQModel.retry_eligible == True
-                ).scalar()
-                ready_for_retry = session.query(func.count(DLQModel.id)).filter(
-                    and_(
-                        DLQModel.retry_eligible == True,
-                        DLQModel.next_retry <= datetime.utcnow()
-                    )
-                ).scalar()
+                counts = session.execute(_DLQ_COUNTS_STMT).one()
                 
                 # Estadísticas por tipo de fallo
-                failure_stats = session.query(
-                    DLQModel.failure_type,
-                    func.count(DLQModel.id).label('count'),
-                    func.avg(DLQModel.attempt_count).label('avg_attempts')
-                ).group_by(DLQModel.failure_type).all()
+                failure_stats = session.execute(_DLQ_FAILURE_STATS_STMT).all()
                 
                 # Estadísticas por tamaño de archivo
-                size_stats = session.query(
-                    func.count(DLQModel.id).label('count'),
-                    func.avg(DLQModel.file_size_mb).label('avg_size'),
-                    func.max(DLQModel.file_size_mb).label('max_size')
-                ).filter(DLQModel.retry_eligible == True).first()
+                size_stats = session.execute(_DLQ_SIZE_STATS_STMT).one()
                 
                 return {
-                    'total_entries': total_entries or 0,
-                    'eligible_for_retry': eligible_for_retry or 0,
-                    'ready_for_retry': ready_for_retry or 0,
+                    'total_entries': counts.total_entries or 0,
+                    'eligible_for_retry': counts.eligible_for_retry or 0,
+                    'ready_for_retry': counts.ready_for_retry or 0,
                     'failure_breakdown': {
                         result.failure_type: {
                             'count': result.count,
@@ -6,17 +6,61 @@ secciones, tablas y datos XBRL.
 """
 
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, ForeignKey, Float, JSON, Boolean,
-    Date, DECIMAL
+    Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Float, JSON, Boolean,
+    Date, Numeric, Index, PrimaryKeyConstraint, text, DDL, event, Enum as SqlEnum
 )
-from sqlalchemy.orm import relationship, Mapped, mapped_column, declarative_base
+from sqlalchemy.orm import relationship, Mapped, mapped_column, declarative_base, validates
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from decimal import Decimal
 import enum
 
 Base = declarative_base()
 
+# --- Timestamps generados por el servidor ---
+
+class utcnow(FunctionElement):
+    """CURRENT_TIMESTAMP en UTC, evaluado por la base de datos en el INSERT/UPDATE."""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    # SQLite ya devuelve CURRENT_TIMESTAMP en UTC
+    return "CURRENT_TIMESTAMP"
+
+# --- Particionado por rango (PostgreSQL) ---
+# Las tablas con info={"partition_key": ...} se crean como
+# PARTITION BY RANGE en PostgreSQL; en SQLite son tablas normales.
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _pg_partitioned_primary_key(constraint, compiler, **kw):
+    # PostgreSQL exige que la PK de una tabla particionada incluya la clave de
+    # partición; el mapper (y SQLite) siguen usando solo `id`
+    partition_key = constraint.table.info.get("partition_key")
+    if not partition_key:
+        return compiler.visit_primary_key_constraint(constraint, **kw)
+    columns = [c.name for c in constraint.columns_autoinc_first] + [partition_key]
+    return f"PRIMARY KEY ({', '.join(compiler.preparer.quote(c) for c in columns)})"
+
+# --- Accession numbers ---
+
+def accession_to_int(accession_number: str) -> int:
+    """'0001234567-25-000001' -> 123456725000001 (18 dígitos, cabe en BIGINT)."""
+    return int(accession_number.replace("-", ""))
+
+def accession_from_int(accession_int: int) -> str:
+    """Reconstruye el formato de display XXXXXXXXXX-YY-NNNNNN."""
+    digits = f"{accession_int:018d}"
+    return f"{digits[:10]}-{digits[10:12]}-{digits[12:]}"
+
 # --- Enums para Tipos y Estados ---
 
 class ProcessingTier(str, enum.Enum):
@@ -32,6 +76,42 @@ class ProcessingStatus(str, enum.Enum):
     FAILED = "failed"
     DEAD_LETTER = "dead_letter"
 
+class FailureType(str, enum.Enum):
+    TIMEOUT = "timeout"
+    MEMORY = "memory"
+    NETWORK = "network"
+    PARSING = "parsing"
+    PROCESSING = "processing"
+    TEMPORARY = "temporary"
+    FILE_TOO_LARGE = "file_too_large"
+
+class SectionType(str, enum.Enum):
+    PORTFOLIO = "portfolio"
+    PERFORMANCE = "performance"
+    EXPENSES = "expenses"
+    RISK_FACTORS = "risk_factors"
+    FINANCIALS = "financials"
+    OTHER = "other"
+
+class ParsingStrategy(str, enum.Enum):
+    SGML_ONLY = "sgml_only"
+    XBRL_ONLY = "xbrl_only"
+    HYBRID = "hybrid"
+
+def _pg_enum(enum_cls: type, name: str) -> SqlEnum:
+    """
+    ENUM nativo en PostgreSQL (4 bytes por fila) y VARCHAR en SQLite.
+    Se persiste el `value` del enum, no el nombre, para que las consultas
+    con literales ('pending', 'completed', ...) sigan funcionando.
+    """
+    return SqlEnum(
+        enum_cls, name=name, native_enum=True,
+        values_callable=lambda members: [m.value for m in members],
+    )
+
+PROCESSING_TIER_ENUM = _pg_enum(ProcessingTier, "processing_tier_enum")
+PROCESSING_STATUS_ENUM = _pg_enum(ProcessingStatus, "processing_status_enum")
+
 # --- Modelos Principales ---
 
 class Filing(Base):
@@ -40,9 +120,22 @@ class Filing(Base):
     del procesamiento.
     """
     __tablename__ = "filings"
+    # Índice parcial para la cola de trabajo: solo contiene filings pendientes o
+    # en curso (no el histórico de completados) y ya viene ordenado por
+    # created_at para el desencolado FIFO.
+    __table_args__ = (
+        Index(
+            "ix_filings_work_queue", "created_at",
+            postgresql_where=text("processing_status IN ('pending', 'processing')"),
+            sqlite_where=text("processing_status IN ('pending', 'processing')"),
+        ),
+    )
 
     filing_id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    accession_number: Mapped[str] = mapped_column(String(32), unique=True, index=True, nullable=False)
+    # Las búsquedas y el upsert usan accession_int (índice de 8 bytes);
+    # accession_number se conserva solo como forma de display
+    accession_number: Mapped[str] = mapped_column(String(32), nullable=False)
+    accession_int: Mapped[int] = mapped_column(BigInteger, unique=True, index=True, nullable=False)
     cik: Mapped[str] = mapped_column(String(20), index=True, nullable=False)
     company_name: Mapped[str] = mapped_column(String(512))
     form_type: Mapped[str] = mapped_column(String(32), index=True)
@@ -58,36 +151,45 @@ class Filing(Base):
     business_phone: Mapped[Optional[str]] = mapped_column(String(50))
     
     # Campos de estadísticas de parsing
-    sgml_parsing_time: Mapped[Optional[float]] = mapped_column(Float)
-    xbrl_parsing_time: Mapped[Optional[float]] = mapped_column(Float)
-    integrated_parsing_time: Mapped[Optional[float]] = mapped_column(Float)
+    sgml_parsing_time: Mapped[Optional[float]] = mapped_column(Float(asdecimal=False))
+    xbrl_parsing_time: Mapped[Optional[float]] = mapped_column(Float(asdecimal=False))
+    integrated_parsing_time: Mapped[Optional[float]] = mapped_column(Float(asdecimal=False))
     xbrl_facts_count: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Flags de éxito del parsing
     sgml_parsed: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
     xbrl_parsed: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
-    parsing_strategy: Mapped[Optional[str]] = mapped_column(String(50))  # "sgml_only", "xbrl_only", "hybrid"
+    parsing_strategy: Mapped[Optional[ParsingStrategy]] = mapped_column(_pg_enum(ParsingStrategy, "parsing_strategy_enum"))
     
     filing_url: Mapped[Optional[str]] = mapped_column(Text)
     filing_html_url: Mapped[Optional[str]] = mapped_column(Text)
     
-    file_size_mb: Mapped[float] = mapped_column(Float, default=0.0)
-    processing_status: Mapped[str] = mapped_column(String(50), default=ProcessingStatus.PENDING, index=True)
-    processing_tier: Mapped[Optional[str]] = mapped_column(String(50), index=True)
+    file_size_mb: Mapped[float] = mapped_column(Float(asdecimal=False), default=0.0)
+    processing_status: Mapped[ProcessingStatus] = mapped_column(PROCESSING_STATUS_ENUM, default=ProcessingStatus.PENDING)
+    processing_tier: Mapped[Optional[ProcessingTier]] = mapped_column(PROCESSING_TIER_ENUM, index=True)
     
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), server_onupdate=utcnow())
 
     # Relaciones
+    # Las relaciones "calientes" usan lazy="raise"/"raise_on_sql": se cargan
+    # explícitamente con selectinload/joinedload (ver filings_for_summary) y
+    # cualquier lazy load que necesite SQL falla en lugar de provocar un N+1.
+    # raise_on_sql aún permite resolver desde el identity map sin query.
     documents: Mapped[List["FilingDocument"]] = relationship("FilingDocument", back_populates="filing", cascade="all, delete-orphan")
-    fund_metadata: Mapped[Optional["FundMetadata"]] = relationship("FundMetadata", back_populates="filing", uselist=False, cascade="all, delete-orphan")
-    sections: Mapped[List["NcsrSection"]] = relationship("NcsrSection", back_populates="filing", cascade="all, delete-orphan")
-    tables: Mapped[List["NcsrTable"]] = relationship("NcsrTable", back_populates="filing", cascade="all, delete-orphan")
+    fund_metadata: Mapped[Optional["FundMetadata"]] = relationship("FundMetadata", back_populates="filing", uselist=False, cascade="all, delete-orphan", lazy="raise")
+    sections: Mapped[List["NcsrSection"]] = relationship("NcsrSection", back_populates="filing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    tables: Mapped[List["NcsrTable"]] = relationship("NcsrTable", back_populates="filing", cascade="all, delete-orphan", lazy="raise_on_sql")
     xbrl_data: Mapped[Optional["NcsrXbrl"]] = relationship("NcsrXbrl", back_populates="filing", uselist=False, cascade="all, delete-orphan")
-    xbrl_facts: Mapped[List["XbrlFact"]] = relationship("XbrlFact", back_populates="filing", cascade="all, delete-orphan")
-    processing_logs: Mapped[List["ProcessingLog"]] = relationship("ProcessingLog", back_populates="filing", cascade="all, delete-orphan")
+    xbrl_facts: Mapped[List["XbrlFact"]] = relationship("XbrlFact", back_populates="filing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    processing_logs: Mapped[List["ProcessingLog"]] = relationship("ProcessingLog", back_populates="filing", cascade="all, delete-orphan", lazy="raise_on_sql")
     dead_letter_entry: Mapped[Optional["DeadLetterQueue"]] = relationship("DeadLetterQueue", back_populates="filing", uselist=False, cascade="all, delete-orphan")
-    processing_result: Mapped[Optional["ProcessingResult"]] = relationship("ProcessingResult", back_populates="filing", uselist=False, cascade="all, delete-orphan")
+    processing_result: Mapped[Optional["ProcessingResult"]] = relationship("ProcessingResult", back_populates="filing", uselist=False, cascade="all, delete-orphan", lazy="raise")
+
+    @validates("accession_number")
+    def _sync_accession_int(self, key, value):
+        self.accession_int = accession_to_int(value)
+        return value
 
     def __repr__(self):
         return f"<Filing(accession_number='{self.accession_number}', cik='{self.cik}', status='{self.processing_status}')>"
@@ -109,14 +211,23 @@ class FilingDocument(Base):
 class FundMetadata(Base):
     """Metadatos específicos del fondo extraídos del filing."""
     __tablename__ = "fund_metadata"
+    # GIN con jsonb_path_ops: solo soporta @>, pero es más pequeño y rápido
+    # que jsonb_ops para las búsquedas por contención (p.ej. {"ticker": "..."})
+    __table_args__ = (
+        Index(
+            "ix_fund_metadata_raw_data_gin", "raw_data",
+            postgresql_using="gin", postgresql_ops={"raw_data": "jsonb_path_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filing_id: Mapped[int] = mapped_column(ForeignKey("filings.filing_id"), unique=True, index=True)
     fund_name: Mapped[Optional[str]] = mapped_column(String(512))
-    total_net_assets: Mapped[Optional[float]] = mapped_column(DECIMAL(20, 2))
+    # Importes monetarios: Decimal exacto; ratios y métricas: float nativo
+    total_net_assets: Mapped[Optional[Decimal]] = mapped_column(Numeric(20, 2, asdecimal=True))
     shares_outstanding: Mapped[Optional[int]] = mapped_column(Integer)
-    nav_per_share: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 4))
-    expense_ratio: Mapped[Optional[float]] = mapped_column(DECIMAL(6, 4))
+    nav_per_share: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 4, asdecimal=True))
+    expense_ratio: Mapped[Optional[float]] = mapped_column(Numeric(6, 4, asdecimal=False))
     portfolio_date: Mapped[Optional[datetime]] = mapped_column(Date)
     raw_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
 
@@ -129,15 +240,27 @@ class NcsrSection(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filing_id: Mapped[int] = mapped_column(ForeignKey("filings.filing_id"), index=True)
     section_name: Mapped[str] = mapped_column(String(256))
-    section_type: Mapped[str] = mapped_column(String(50))  # 'portfolio', 'performance', etc.
+    section_type: Mapped[SectionType] = mapped_column(_pg_enum(SectionType, "section_type_enum"))
     text_clean: Mapped[str] = mapped_column(Text)
     word_count: Mapped[int] = mapped_column(Integer)
 
     filing: Mapped["Filing"] = relationship("Filing", back_populates="sections")
 
 class NcsrTable(Base):
-    """Una tabla extraída de una sección del filing."""
+    """
+    Una tabla extraída de una sección del filing.
+
+    El contenido decodificado se guarda completo en `data` como
+    {"columns": [...], "types": [...], "rows": [[...], ...]}, en lugar de
+    expandirlo a una fila por celda.
+    """
     __tablename__ = "ncsr_tables"
+    __table_args__ = (
+        Index(
+            "ix_ncsr_tables_data_gin", "data",
+            postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filing_id: Mapped[int] = mapped_column(ForeignKey("filings.filing_id"), index=True)
@@ -146,33 +269,29 @@ class NcsrTable(Base):
     table_html: Mapped[str] = mapped_column(Text)
     row_count: Mapped[int] = mapped_column(Integer)
     column_count: Mapped[int] = mapped_column(Integer)
+    data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)  # columns/types/rows
 
     filing: Mapped["Filing"] = relationship("Filing", back_populates="tables")
-    rows: Mapped[List["NcsrTableRow"]] = relationship("NcsrTableRow", back_populates="table", cascade="all, delete-orphan")
-
-class NcsrTableRow(Base):
-    """Una fila de una tabla, normalizada en formato largo."""
-    __tablename__ = "ncsr_table_rows"
-
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    table_id: Mapped[int] = mapped_column(ForeignKey("ncsr_tables.id"), index=True)
-    row_index: Mapped[int] = mapped_column(Integer)
-    col_name: Mapped[str] = mapped_column(String(256))
-    col_value: Mapped[str] = mapped_column(Text)
-    col_type: Mapped[str] = mapped_column(String(50))  # 'currency', 'percentage', 'text'
-
-    table: Mapped["NcsrTable"] = relationship("NcsrTable", back_populates="rows")
 
 class NcsrXbrl(Base):
     """Datos extraídos del componente XBRL de un filing."""
     __tablename__ = "ncsr_xbrl"
+    __table_args__ = (
+        Index(
+            "ix_ncsr_xbrl_key_metrics_gin", "key_metrics",
+            postgresql_using="gin", postgresql_ops={"key_metrics": "jsonb_path_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filing_id: Mapped[int] = mapped_column(ForeignKey("filings.filing_id"), unique=True, index=True)
     xbrl_url: Mapped[str] = mapped_column(Text)
     key_metrics: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
-    raw_xml: Mapped[Optional[str]] = mapped_column(Text)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # El XML crudo (5-50 MB) vive fuera de la BD; aquí solo se guarda un
+    # puntero (ruta local o s3://) y su digest para verificar integridad
+    raw_xml_uri: Mapped[Optional[str]] = mapped_column(String(512))
+    raw_xml_sha256: Mapped[Optional[str]] = mapped_column(String(64))
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
 
     filing: Mapped["Filing"] = relationship("Filing", back_populates="xbrl_data")
 
@@ -180,12 +299,32 @@ class NcsrXbrl(Base):
 class XbrlFact(Base):
     """Tabla para almacenar hechos XBRL individuales."""
     __tablename__ = "xbrl_facts"
+    __table_args__ = (
+        Index(
+            "ix_xbrl_facts_additional_attributes_gin", "additional_attributes",
+            postgresql_using="gin", postgresql_ops={"additional_attributes": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_xbrl_facts_created_brin", "created_at",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32},
+        ),
+        # Lookup (filing_id, concept) con unit_ref/period_end_date en las hojas
+        # para index-only scans. `value` no se incluye: los text blocks XBRL
+        # superan el tamaño máximo de tupla de un B-Tree.
+        Index(
+            "ix_xbrl_lookup", "filing_id", "concept",
+            postgresql_include=["unit_ref", "period_end_date"],
+        ),
+        # Particiones mensuales: la limpieza es un DROP de partición y las
+        # consultas por rango de fechas solo tocan las particiones relevantes
+        {"postgresql_partition_by": "RANGE (created_at)", "info": {"partition_key": "created_at"}},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    filing_id: Mapped[int] = mapped_column(ForeignKey("filings.filing_id"), index=True)
+    filing_id: Mapped[int] = mapped_column(ForeignKey("filings.filing_id"))
     
     # Campos principales del hecho XBRL
-    concept: Mapped[str] = mapped_column(String(255), index=True)
+    concept: Mapped[str] = mapped_column(String(255))
     value: Mapped[Optional[str]] = mapped_column(Text)
     unit_ref: Mapped[Optional[str]] = mapped_column(String(50))
     context_ref: Mapped[Optional[str]] = mapped_column(String(100))
@@ -204,13 +343,22 @@ class XbrlFact(Base):
     # Atributos adicionales como JSON
     additional_attributes: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
     
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), nullable=False)
 
     filing: Mapped["Filing"] = relationship("Filing", back_populates="xbrl_facts")
 
 class ProcessingLog(Base):
     """Log detallado de las operaciones de procesamiento para trazabilidad."""
     __tablename__ = "processing_logs"
+    # Tabla append-only: BRIN resume rangos de páginas por created_at y es
+    # órdenes de magnitud más pequeño que un B-Tree para los rollups diarios.
+    __table_args__ = (
+        Index(
+            "ix_processing_logs_created_brin", "created_at",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32},
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)", "info": {"partition_key": "created_at"}},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filing_id: Mapped[Optional[int]] = mapped_column(ForeignKey("filings.filing_id"), index=True)
@@ -218,7 +366,7 @@ class ProcessingLog(Base):
     status: Mapped[str] = mapped_column(String(50))
     message: Mapped[str] = mapped_column(Text)
     execution_time_ms: Mapped[Optional[int]] = mapped_column(Integer)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), nullable=False)
 
     filing: Mapped["Filing"] = relationship("Filing", back_populates="processing_logs")
 
@@ -230,35 +378,45 @@ class ProcessingResult(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filing_id: Mapped[int] = mapped_column(ForeignKey("filings.filing_id"), unique=True, nullable=False, index=True)
-    processing_tier: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
+    processing_tier: Mapped[ProcessingTier] = mapped_column(PROCESSING_TIER_ENUM, nullable=False, index=True)
     success: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     error_message: Mapped[Optional[str]] = mapped_column(Text)
     table_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     section_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
-    processing_duration: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    processing_duration: Mapped[float] = mapped_column(Float(asdecimal=False), default=0.0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), nullable=False)
 
     filing: Mapped["Filing"] = relationship("Filing", back_populates="processing_result")
 
 class DeadLetterQueue(Base):
     """Modelo para cola de reintentos de filings fallidos."""
     __tablename__ = "dead_letter_queue"
+    # Índice parcial sobre la cola de reintentos viva: el scheduler solo lee filas
+    # elegibles, ordenadas por prioridad, así que el índice crece con los
+    # reintentos pendientes y no con el histórico de fallos.
+    __table_args__ = (
+        Index(
+            "ix_dlq_retry_ready", "priority", "next_retry",
+            postgresql_where=text("retry_eligible = true"),
+            sqlite_where=text("retry_eligible = 1"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filing_id: Mapped[int] = mapped_column(ForeignKey("filings.filing_id"), unique=True, nullable=False, index=True)
     failure_reason: Mapped[str] = mapped_column(String(500), nullable=False)
-    failure_type: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    failure_type: Mapped[FailureType] = mapped_column(_pg_enum(FailureType, "failure_type_enum"), nullable=False, index=True)
     original_tier: Mapped[Optional[str]] = mapped_column(String(20))
-    file_size_mb: Mapped[float] = mapped_column(Float, nullable=False)
+    file_size_mb: Mapped[float] = mapped_column(Float(asdecimal=False), nullable=False)
     attempt_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
     max_attempts: Mapped[int] = mapped_column(Integer, default=5, nullable=False)
-    retry_eligible: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, index=True)
-    last_attempt: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
-    next_retry: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True)
+    retry_eligible: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    last_attempt: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), nullable=False)
+    next_retry: Mapped[Optional[datetime]] = mapped_column(DateTime)
     suggested_tier: Mapped[Optional[str]] = mapped_column(String(20))
     priority: Mapped[int] = mapped_column(Integer, default=1, nullable=False, index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), server_onupdate=utcnow(), nullable=False)
 
     filing: Mapped["Filing"] = relationship("Filing", back_populates="dead_letter_entry")
 
@@ -271,8 +429,57 @@ class ProcessingMetricsDaily(Base):
     total_files_processed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     successful_files: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     failed_files: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
-    avg_processing_duration: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    avg_processing_duration: Mapped[float] = mapped_column(Float(asdecimal=False), default=0.0, nullable=False)
     total_tables_extracted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     dead_lettered: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
-    success_rate: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    success_rate: Mapped[float] = mapped_column(Float(asdecimal=False), default=0.0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow(), nullable=False)
+
+# --- Triggers de updated_at ---
+# server_onupdate solo indica a SQLAlchemy que el valor lo genera la BD;
+# estos triggers son los que efectivamente lo refrescan. Un valor asignado
+# explícitamente en el UPDATE se respeta.
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+                NEW.updated_at = TIMEZONE('utc', CURRENT_TIMESTAMP);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """).execute_if(dialect="postgresql"),
+)
+
+def _attach_updated_at_trigger(table, pk: str) -> None:
+    """Registra el trigger de updated_at para `table` en PostgreSQL y SQLite."""
+    name = f"trg_{table.name}_updated_at"
+    event.listen(table, "after_create", DDL(
+        f"CREATE TRIGGER {name} BEFORE UPDATE ON {table.name} "
+        f"FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+    ).execute_if(dialect="postgresql"))
+    event.listen(table, "after_create", DDL(
+        f"CREATE TRIGGER IF NOT EXISTS {name} AFTER UPDATE ON {table.name} "
+        f"FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN "
+        f"UPDATE {table.name} SET updated_at = CURRENT_TIMESTAMP WHERE {pk} = NEW.{pk}; END"
+    ).execute_if(dialect="sqlite"))
+
+_attach_updated_at_trigger(Filing.__table__, "filing_id")
+_attach_updated_at_trigger(DeadLetterQueue.__table__, "id")
+
+# --- Particiones por defecto ---
+# Recogen las filas cuyo mes aún no tiene partición propia; las mensuales
+# se crean con DatabaseManager.create_monthly_partition.
+
+def _attach_default_partition(table) -> None:
+    """Crea la partición DEFAULT de `table` en PostgreSQL."""
+    event.listen(table, "after_create", DDL(
+        f"CREATE TABLE IF NOT EXISTS {table.name}_default PARTITION OF {table.name} DEFAULT"
+    ).execute_if(dialect="postgresql"))
+
+_attach_default_partition(XbrlFact.__table__)
+_attach_default_partition(ProcessingLog.__table__)
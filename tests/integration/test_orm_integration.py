@@ -3,20 +3,46 @@ Test de integración para verificar que el ORM funciona correctamente
 con el TieredProcessor
 """
 import pytest
+from contextlib import contextmanager
 from datetime import datetime
 from unittest.mock import patch, MagicMock
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
 
 from sec_extractor.core.tiered_processor import TieredProcessor
-from sec_extractor.storage.database import DatabaseManager
+from sec_extractor.storage.database import DatabaseManager, filings_for_summary
+from sec_extractor.storage.models import (
+    Filing, ProcessingResult, XbrlFact, accession_to_int, accession_from_int
+)
 from sec_extractor.config.settings import settings
 
+@contextmanager
+def count_queries(engine):
+    """Cuenta las sentencias SQL emitidas por `engine` dentro del bloque"""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
 class TestORMIntegration:
     """Tests de integración ORM + TieredProcessor"""
     
     @pytest.fixture
     def test_processor(self):
         """Fixture para TieredProcessor con BD en memoria"""
-        return TieredProcessor("sqlite:///:memory:")
+        processor = TieredProcessor("sqlite:///:memory:")
+        try:
+            yield processor
+        finally:
+            processor.db.engine.dispose()
+            processor.dlq.db.engine.dispose()
     
     def test_process_filing_with_orm(self, test_processor):
         """Test completo de procesamiento con persistencia ORM"""
@@ -54,6 +80,10 @@ class TestORMIntegration:
         assert filing['cik'] == '1234567'
         assert filing['company_name'] == 'Test Mutual Fund'
     
+    def test_dlq_shares_processor_engine(self, test_processor):
+        """La DLQ reutiliza el DatabaseManager (y el pool) del procesador"""
+        assert test_processor.dlq.db is test_processor.db
+
     def test_dead_letter_queue_integration(self, test_processor):
         """Test integración con Dead Letter Queue"""
         
@@ -144,6 +174,145 @@ class TestORMIntegration:
         assert isinstance(cleanup_results, dict)
         # Los contadores pueden ser 0 o más dependiendo de qué se limpie
 
+    def test_filings_for_summary_eager_loads(self):
+        """Las relaciones de reporte se precargan y no disparan lazy loads"""
+        db = DatabaseManager("sqlite:///:memory:")
+
+        with db.get_session() as session:
+            for i in range(3):
+                filing = Filing(
+                    accession_number=f'000765432{i}-25-000001',
+                    cik=f'765432{i}',
+                    company_name=f'Summary Fund {i}',
+                    form_type='N-CSR',
+                    filed_at=datetime(2025, 1, 2).date(),
+                )
+                filing.processing_result = ProcessingResult(processing_tier='standard', success=True)
+                filing.xbrl_facts = [XbrlFact(concept='invco:NetAssets', value=str(1000 * i))]
+                session.add(filing)
+            session.commit()
+
+        with db.get_session() as session:
+            filings = filings_for_summary(session)
+
+        assert len(filings) == 3
+        assert all(f.processing_result.success for f in filings)
+        assert [len(f.xbrl_facts) for f in filings] == [1, 1, 1]
+        assert all(f.tables == [] for f in filings)
+
+        # 1 SELECT (con JOIN a fund_metadata) + 1 por cada selectinload,
+        # independiente del número de filings
+        with count_queries(db.engine) as statements:
+            with db.get_session() as session:
+                filings_for_summary(session)
+        assert len(statements) <= 4
+
+        # Sin eager loading explícito, el acceso perezoso está prohibido
+        with db.get_session() as session:
+            plain = session.scalars(select(Filing)).first()
+            with pytest.raises(InvalidRequestError):
+                plain.xbrl_facts
+
+        # El reporte usa la misma carga: más reciente primero, sin lazy loads
+        with count_queries(db.engine) as statements:
+            report = db.get_recent_filings_report(limit=2)
+        assert len(statements) <= 4
+        assert [r["accession_number"] for r in report] == ['0007654322-25-000001', '0007654321-25-000001']
+        assert report[0]["success"] is True
+        assert report[0]["xbrl_facts"] == 1
+        assert report[0]["tables"] == 0
+
+    def test_bulk_create_filings_upsert(self):
+        """El alta en lote hace upsert por accession_number"""
+        db = DatabaseManager("sqlite:///:memory:")
+        metas = [
+            {
+                'accession_number': f'0007654321-25-{i:06d}',
+                'cik': '7654321',
+                'company_name': f'Bulk Fund {i}',
+                'form_type': 'N-CSR',
+                'filing_date': '2025-01-02',
+            }
+            for i in range(5)
+        ]
+
+        assert db.bulk_create_filings(metas, batch_size=2) == 5
+
+        metas[0]['company_name'] = 'Bulk Fund Renamed'
+        assert db.bulk_create_filings(metas[:1]) == 1
+
+        with db.get_session() as session:
+            names = session.scalars(select(Filing.company_name).order_by(Filing.accession_number)).all()
+
+        assert len(names) == 5
+        assert names[0] == 'Bulk Fund Renamed'
+
+    def test_filing_status_and_result_by_filing_id(self):
+        """Estado, resultado y lectura por accession usan Filing.filing_id"""
+        db = DatabaseManager("sqlite:///:memory:")
+        filing_id = db.create_or_update_filing({
+            'accession_number': '0007654321-25-000100',
+            'cik': '7654321',
+            'company_name': 'Status Fund',
+            'form_type': 'N-CSR',
+            'filing_date': '2025-01-02',
+        })
+
+        assert db.update_filing_processing_status(filing_id, 'standard', 'processing')
+        assert db.save_processing_result(filing_id, {'success': True, 'table_count': 2}, 'standard')
+
+        filing = db.get_filing_by_accession('0007654321-25-000100')
+        assert filing['id'] == filing_id
+        assert filing['filing_date'] == datetime(2025, 1, 2).date()
+        assert filing['processing_status'] == 'completed'
+
+        with db.get_session() as session:
+            result = session.scalars(select(ProcessingResult)).one()
+        assert result.filing_id == filing_id
+        assert result.table_count == 2
+
+    def test_cleanup_old_data_dispatch_by_dialect(self):
+        """SQLite poda xbrl_facts/processing_logs con DELETE; PostgreSQL con DROP de particiones"""
+        db = DatabaseManager("sqlite:///:memory:")
+        old = datetime(2000, 1, 1)
+        with db.get_session() as session:
+            filing = Filing(
+                accession_number='0007654321-25-000200', cik='7654321',
+                company_name='Retention Fund', form_type='N-CSR',
+                filed_at=datetime(2025, 1, 2).date(),
+            )
+            filing.xbrl_facts = [
+                XbrlFact(concept='invco:NetAssets', value='1', created_at=old),
+                XbrlFact(concept='invco:NetAssets', value='2'),
+            ]
+            session.add(filing)
+            session.commit()
+
+        with patch.object(DatabaseManager, 'drop_partitions_before') as drop:
+            results = db.cleanup_old_data(days_to_keep=30)
+        drop.assert_not_called()
+        assert results['xbrl_facts'] == 1
+        assert results['processing_logs'] == 0
+
+        with patch.object(db.engine.dialect, 'name', 'postgresql'), \
+             patch.object(DatabaseManager, 'drop_partitions_before', return_value=['xbrl_facts_199912']) as drop:
+            results = db.cleanup_old_data(days_to_keep=30)
+        assert sorted(call.args[0] for call in drop.call_args_list) == ['processing_logs', 'xbrl_facts']
+        assert results['xbrl_facts_partitions_dropped'] == 1
+        assert 'xbrl_facts' not in results
+
+        with db.get_session() as session:
+            assert session.scalars(select(XbrlFact.value)).all() == ['2']
+
+    def test_accession_int_roundtrip(self):
+        """accession_int se deriva de accession_number y es reversible"""
+        accession = '0001234567-25-000001'
+        assert accession_to_int(accession) == 123456725000001
+        assert accession_from_int(accession_to_int(accession)) == accession
+
+        filing = Filing(accession_number=accession, cik='1234567')
+        assert filing.accession_int == 123456725000001
+
 if __name__ == "__main__":
     # Run basic test
     processor = TieredProcessor("sqlite:///:memory:")
@@ -23,10 +23,11 @@ class TestProcessors(unittest.TestCase):
         </html>
         """
         
-        # HTML de prueba grande (simular archivo grande)
-        self.large_html = "<html><body>" + "x" * 50000000 + "</body></html>"  # 50MB
-        
         self.test_meta = {'cik': '1234567', 'filing_date': '2024-01-01'}
+        
+        # Archivo grande simulado: el router de tiers solo mira file_size_mb,
+        # así que no hace falta materializar 50MB de HTML
+        self.large_meta = {**self.test_meta, 'file_size_mb': 50.0}
     
     def test_small_file_processing(self):
         """Test procesamiento de archivo pequeño"""
@@ -38,7 +39,7 @@ class TestProcessors(unittest.TestCase):
     
     def test_large_file_processing(self):
         """Test procesamiento de archivo grande"""
-        result = self.processor.process_filing(self.test_meta, self.large_html)
+        result = self.processor.process_filing(self.large_meta, self.small_html)
         
         # Archivo grande debe ir a minimal o dead letter
         self.assertIn(result['processing_tier'], ['minimal', 'dead_letter'])
@@ -4,66 +4,234 @@ Simple smoke test para verificar la conectividad básica de la base de datos
 sin intentar crear o modificar tablas.
 """
 
+import atexit
+import importlib.util
+import json
 import os
+import re
 import sys
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from functools import cache, lru_cache
+
+# sqlalchemy y dotenv se importan dentro de las funciones: importar el módulo
+# (p.ej. para reutilizar main()) no paga su carga. Para psycopg basta saber si existe.
+PSYCOPG3_AVAILABLE = importlib.util.find_spec("psycopg") is not None
+
+# Variables de entorno requeridas
+REQUIRED_VARS = ("PG_DSN",)
+
+# Sin PG_DSN, EDGAR_SMOKE_SQLITE=1 permite un dry run en CI contra SQLite en memoria
+SQLITE_FALLBACK_URL = "sqlite+pysqlite:///:memory:"
+
+# SELECT 1, tablas de filing (máx. 5) y filas estimadas de la primera,
+# todo en una sola consulta
+_SMOKE_SQL = """
+    WITH t AS (
+        SELECT table_schema, table_name
+        FROM information_schema.tables
+        WHERE table_name LIKE '%filing%'
+        ORDER BY table_name
+        LIMIT 5
+    )
+    SELECT
+        1 AS test,
+        ARRAY(SELECT table_name::text FROM t) AS filing_tables,
+        (
+            SELECT c.reltuples::bigint
+            FROM pg_class c
+            WHERE c.oid = (
+                SELECT to_regclass(format('%I.%I', table_schema, table_name))
+                FROM t
+                LIMIT 1
+            )
+        ) AS approx_rows
+"""
+
+# Equivalente para SQLite: sin information_schema ni pg_class (sin estimación de filas)
+_SQLITE_SMOKE_SQL = """
+    SELECT
+        1 AS test,
+        (
+            SELECT json_group_array(name)
+            FROM (
+                SELECT name FROM sqlite_master
+                WHERE type = 'table' AND name LIKE '%filing%'
+                ORDER BY name
+                LIMIT 5
+            )
+        ) AS filing_tables,
+        NULL AS approx_rows
+"""
+
+# Con EDGAR_FILING_TABLE la tabla ya es conocida: solo conectividad + estimación
+_KNOWN_TABLE_SQL = """
+    SELECT
+        1 AS test,
+        (
+            SELECT c.reltuples::bigint
+            FROM pg_class c
+            WHERE c.oid = to_regclass(:table_name)
+        ) AS approx_rows
+"""
+_SQLITE_KNOWN_TABLE_SQL = "SELECT 1 AS test, NULL AS approx_rows"
+
+# Identificador SQL simple (validación temprana de EDGAR_FILING_TABLE)
+_TABLE_NAME_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+
+@cache
+def load_env():
+    """Carga .env una sola vez; sin python-dotenv se usa os.environ tal cual."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+@cache
+def _statements():
+    """Construye (una vez, al primer uso) las sentencias SQLAlchemy de las pruebas."""
+    from sqlalchemy import String, bindparam, text
+
+    return {
+        "smoke": text(_SMOKE_SQL),
+        "sqlite_smoke": text(_SQLITE_SMOKE_SQL),
+        "known_table": text(_KNOWN_TABLE_SQL).bindparams(bindparam("table_name", type_=String())),
+        "sqlite_known_table": text(_SQLITE_KNOWN_TABLE_SQL),
+    }
+
+
+def get_database_url():
+    """PG_DSN, o SQLite en memoria si EDGAR_SMOKE_SQLITE=1 y no hay PG_DSN."""
+    load_env()
+    database_url = os.getenv("PG_DSN")
+    if database_url:
+        return normalize_dsn(database_url)
+    return SQLITE_FALLBACK_URL if os.getenv("EDGAR_SMOKE_SQLITE") == "1" else None
+
+
+def normalize_dsn(database_url: str) -> str:
+    """
+    Usa psycopg 3 para DSN `postgresql://` sin driver explícito, si está instalado.
+    
+    Un driver explícito (p.ej. `postgresql+psycopg2://` de .env.example) se respeta.
+    """
+    from sqlalchemy import make_url
+
+    url = make_url(database_url)
+    if PSYCOPG3_AVAILABLE and url.drivername in ("postgresql", "postgres"):
+        url = url.set(drivername="postgresql+psycopg")
+    return url.render_as_string(hide_password=False)
+
+
+@cache
+def _env_snapshot():
+    """Lee una sola vez (tras load_dotenv) las variables requeridas: {var: (valor, valor enmascarado)}."""
+    load_env()
+    snapshot = {}
+    for var in REQUIRED_VARS:
+        value = os.environ.get(var)
+        # Mostrar solo los primeros caracteres por seguridad
+        masked_value = value[:20] + "..." if value and len(value) > 20 else value
+        snapshot[var] = (value, masked_value)
+    return snapshot
+
+
+@lru_cache(maxsize=1)
+def get_engine(database_url: str):
+    """Engine compartido (con pool) para todas las pruebas del proceso."""
+    from sqlalchemy import create_engine, make_url
+
+    if make_url(database_url).get_backend_name() == "sqlite":
+        # SQLite en memoria usa su propio pool de una conexión
+        engine = create_engine(database_url)
+    else:
+        engine = create_engine(
+            database_url,
+            pool_size=5,
+            max_overflow=10,
+            pool_pre_ping=True
+        )
+    # Cerrar el pool solo al salir del proceso, no tras cada prueba
+    atexit.register(engine.dispose)
+    return engine
 
-load_dotenv()
 
 def simple_db_test():
     """Test básico de conectividad de base de datos."""
     print("🔥 Edgar Simple Database Smoke Test")
     print("=" * 40)
     
-    database_url = os.getenv("PG_DSN")
+    database_url = get_database_url()
     if not database_url:
         print("❌ Variable PG_DSN no encontrada en .env")
         return False
     
+    known_table = os.getenv("EDGAR_FILING_TABLE")
+    if known_table and not _TABLE_NAME_RE.match(known_table):
+        print(f"❌ EDGAR_FILING_TABLE no es un nombre de tabla válido: {known_table!r}")
+        return False
+    
     print(f"🔍 Conectando a la base de datos...")
     
+    # Conteo exacto (COUNT(*), O(N)) solo bajo demanda, p.ej. en ejecuciones nocturnas
+    exact_count = os.getenv("EDGAR_SMOKE_EXACT_COUNT") == "1"
+    
     try:
-        engine = create_engine(database_url)
+        from sqlalchemy import func, select, table
+        
+        engine = get_engine(database_url)
+        statements = _statements()
         
         with engine.connect() as conn:
-            # Test básico de conectividad
-            result = conn.execute(text("SELECT 1 as test"))
-            test_value = result.scalar()
+            # Conectividad, tablas de filing y tamaño en un único round-trip
+            is_postgres = conn.dialect.name == "postgresql"
+            if not known_table:
+                row = conn.execute(statements["smoke" if is_postgres else "sqlite_smoke"]).one()
+            elif is_postgres:
+                # Sin consulta de descubrimiento sobre information_schema
+                row = conn.execute(statements["known_table"], {"table_name": known_table}).one()
+            else:
+                row = conn.execute(statements["sqlite_known_table"]).one()
             
-            if test_value == 1:
+            if row.test == 1:
                 print("✅ Conexión exitosa")
             else:
                 print("❌ Error en test de conexión")
                 return False
             
-            # Verificar que existe alguna tabla de filings
-            tables_check = conn.execute(text("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_name LIKE '%filing%'
-                LIMIT 5
-            """))
+            if known_table:
+                filing_tables = [known_table]
+                print(f"✅ Tabla de filing (EDGAR_FILING_TABLE): {known_table}")
+            else:
+                filing_tables = row.filing_tables if is_postgres else json.loads(row.filing_tables)
+                if filing_tables:
+                    print("✅ Tablas de filing encontradas:")
+                    for table_name in filing_tables:
+                        print(f"   📄 {table_name}")
             
-            filing_tables = tables_check.fetchall()
             if filing_tables:
-                print("✅ Tablas de filing encontradas:")
-                for table in filing_tables:
-                    print(f"   📄 {table[0]}")
+                table_name = filing_tables[0]
+                if not is_postgres:
+                    print("ℹ️ Conteo de registros omitido en SQLite")
+                elif exact_count:
+                    try:
+                        # table() cita el identificador al compilar; sin SQL formateado a mano
+                        count = conn.execute(select(func.count()).select_from(table(table_name))).scalar()
+                        print(f"✅ Registros en {table_name}: {count}")
+                    except Exception as e:
+                        print(f"⚠️ No se pudo contar registros: {e}")
+                elif row.approx_rows is None:
+                    print(f"⚠️ Tabla {table_name} no encontrada")
+                elif row.approx_rows < 0:
+                    # reltuples = -1: la tabla aún no tiene estadísticas (sin ANALYZE)
+                    print(f"⚠️ Registros en {table_name}: sin estadísticas (ejecutar ANALYZE)")
+                else:
+                    # Estimación del planner (pg_class.reltuples): O(1), sin escanear la tabla
+                    print(f"✅ Registros en {table_name} (aprox.): {row.approx_rows}")
             else:
                 print("⚠️ No se encontraron tablas de filing")
             
-            # Test de conteo básico si existe alguna tabla
-            if filing_tables:
-                try:
-                    # Intentar contar registros en la primera tabla encontrada
-                    table_name = filing_tables[0][0]
-                    count_result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-                    count = count_result.scalar()
-                    print(f"✅ Registros en {table_name}: {count}")
-                except Exception as e:
-                    print(f"⚠️ No se pudo contar registros: {e}")
-            
             return True
             
     except Exception as e:
@@ -74,15 +242,13 @@ def test_environment():
     """Verificar variables de entorno necesarias."""
     print("\n🔧 Verificando configuración del entorno...")
     
-    required_vars = ["PG_DSN"]
     all_present = True
     
-    for var in required_vars:
-        value = os.getenv(var)
+    for var, (value, masked_value) in _env_snapshot().items():
         if value:
-            # Mostrar solo los primeros caracteres por seguridad
-            masked_value = value[:20] + "..." if len(value) > 20 else value
             print(f"✅ {var}: {masked_value}")
+        elif var == "PG_DSN" and get_database_url():
+            print(f"⚠️ {var}: No encontrada - usando {SQLITE_FALLBACK_URL} (EDGAR_SMOKE_SQLITE=1)")
         else:
             print(f"❌ {var}: No encontrada")
             all_present = False
@@ -3,59 +3,36 @@ Test configuration and fixtures for parser tests.
 """
 
 import pytest
+import mmap
 import os
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from filelock import FileLock
+    FILELOCK_AVAILABLE = True
+except ImportError:
+    FILELOCK_AVAILABLE = False
+    FileLock = None
+
 # Test data directory
 TEST_DATA_DIR = Path(__file__).parent / "fixtures"
 
-# Sample SEC filing content for testing
-SAMPLE_SGML_CONTENT = '''<SEC-DOCUMENT>0001193125-24-194739.txt : 20240731
-<SEC-HEADER>0001193125-24-194739.hdr.sgml : 20240731
-<ACCEPTANCE-DATETIME>20240731172538
-ACCESSION-NUMBER:		0001193125-24-194739
-CONFORMED-SUBMISSION-TYPE:	N-CSR
-PUBLIC-DOCUMENT-COUNT:		1
-CONFORMED-PERIOD-OF-REPORT:	20240531
-FILED-AS-OF-DATE:		20240731
-DATE-AS-OF-CHANGE:		20240731
-
-FILER:
-	COMPANY-DATA:
-		COMPANY-CONFORMED-NAME:			TIAA-CREF FUNDS
-		CENTRAL-INDEX-KEY:			0001084380
-		STANDARD-INDUSTRIAL-CLASSIFICATION:	UNKNOWN SIC - 0000 [0000]
-		IRS-NUMBER:				13-3985595
-		STATE-OF-INCORPORATION:			MA
-		FISCAL-YEAR-END:			0531
-
-	FILING-VALUES:
-		FORM-TYPE:		N-CSR
-		SEC-ACT:		1940 Act
-		SEC-FILE-NUMBER:	811-05632
-		FILM-NUMBER:		241123734
-</SEC-HEADER>
-
-<DOCUMENT>
-<TYPE>N-CSR
-<SEQUENCE>1
-<FILENAME>g33432gncsr.htm
-<DESCRIPTION>N-CSR
-<TEXT>
-<?xml version='1.0' encoding='ASCII'?>
-<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">
-<head>
-<title>N-CSR</title>
-</head>
-<body>
-<ix:hidden>
-<ix:nonFraction id="test_fact_1" name="oef:AcctVal" contextRef="test_context" unitRef="USD" decimals="INF" scale="0">12345</ix:nonFraction>
-</ix:hidden>
-</body>
-</html>
-</TEXT>
-</DOCUMENT>
-</SEC-DOCUMENT>'''
+# Sample SEC filing (tracked in fixtures/); mapped read-only on first use so
+# every test and xdist worker shares the OS page cache instead of a heap copy
+SAMPLE_SGML_FILE = TEST_DATA_DIR / "sample_n_csr.txt"
+
+@lru_cache(maxsize=1)
+def _sgml_bytes():
+    """Read-only mmap of the sample SGML filing (the mapping outlives the file handle)."""
+    with open(SAMPLE_SGML_FILE, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+@lru_cache(maxsize=1)
+def _sgml_text():
+    """Sample SGML filing decoded once, for tests that need str input."""
+    return _sgml_bytes()[:].decode("utf-8")
 
 SAMPLE_XBRL_INLINE = '''<?xml version='1.0' encoding='ASCII'?>
 <html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">
@@ -68,48 +45,85 @@ SAMPLE_XBRL_INLINE = '''<?xml version='1.0' encoding='ASCII'?>
 </body>
 </html>'''
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_sgml_content():
     """Provide sample SGML content for testing."""
-    return SAMPLE_SGML_CONTENT
+    return _sgml_text()
 
-@pytest.fixture  
+@pytest.fixture(scope="session")
+def sample_sgml_bytes():
+    """Provide sample SGML content as a zero-copy memoryview over the mmap'd file."""
+    return memoryview(_sgml_bytes())
+
+@pytest.fixture(scope="session")
 def sample_xbrl_content():
     """Provide sample XBRL content for testing."""
     return SAMPLE_XBRL_INLINE
 
-@pytest.fixture
-def temp_filing_file(tmp_path):
-    """Create a temporary filing file for testing."""
-    filing_file = tmp_path / "test_filing.txt"
-    filing_file.write_text(SAMPLE_SGML_CONTENT)
+@pytest.fixture(scope="session")
+def temp_filing_file(tmp_path_factory):
+    """Create a temporary filing file, written once per session (tests only read it)."""
+    filing_file = tmp_path_factory.mktemp("filings") / "test_filing.txt"
+    filing_file.write_bytes(_sgml_bytes())
     return filing_file
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def filing_parser():
+    """Shared FilingParser; parsers hold no per-parse state."""
+    # Imported here so modules skipped at collection never load the parser stack
+    from sec_extractor.parsers.integrated_parser import FilingParser
+    return FilingParser()
+
+@pytest.fixture(scope="session")
+def sgml_parser():
+    """Shared SGMLParser; parsers hold no per-parse state."""
+    from sec_extractor.parsers.sgml_parser import SGMLParser
+    return SGMLParser()
+
+class MockHTTPClient:
+    """Stateless stand-in for the SEC HTTP client that always returns the sample filing."""
+    
+    def get_text(self, url, retries=3):
+        return _sgml_text()
+
+@pytest.fixture(scope="session")
 def mock_http_client():
     """Mock HTTP client for testing."""
-    class MockHTTPClient:
-        def get_text(self, url, retries=3):
-            return SAMPLE_SGML_CONTENT
-    
     return MockHTTPClient()
 
 # Test fixtures directory setup
+@lru_cache(maxsize=None)
 def ensure_test_fixtures():
-    """Ensure test fixtures directory exists and has sample files."""
-    TEST_DATA_DIR.mkdir(exist_ok=True)
+    """Ensure test fixtures directory exists and has sample files (once per process)."""
+    TEST_DATA_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Create sample files if they don't exist
+    # Create sample files if they don't exist (sample_n_csr.txt is the tracked
+    # source of the SGML sample, see SAMPLE_SGML_FILE)
     sample_files = {
-        "sample_n_csr.txt": SAMPLE_SGML_CONTENT,
         "sample_xbrl.xml": SAMPLE_XBRL_INLINE,
         "malformed_filing.txt": "This is not a valid SEC filing format"
     }
     
+    # One directory scan instead of a stat() per sample file
+    with os.scandir(TEST_DATA_DIR) as entries:
+        existing = {entry.name for entry in entries}
+    if existing.issuperset(sample_files):
+        return
+    
     for filename, content in sample_files.items():
-        file_path = TEST_DATA_DIR / filename
-        if not file_path.exists():
-            file_path.write_text(content)
+        if filename not in existing:
+            (TEST_DATA_DIR / filename).write_text(content)
 
-# Ensure fixtures exist when module is imported
-ensure_test_fixtures()
+@pytest.fixture(scope="session", autouse=True)
+def _fixtures_on_disk(request, tmp_path_factory):
+    """
+    Create the on-disk fixtures when tests actually run, not at import/collection.
+    
+    Under pytest-xdist (`pytest -n auto --dist=loadfile`) every worker runs
+    this, so creation is serialised with a lock in the shared basetemp root.
+    """
+    lock = nullcontext()
+    if hasattr(request.config, "workerinput") and FILELOCK_AVAILABLE:
+        lock = FileLock(str(tmp_path_factory.getbasetemp().parent / "parser_fixtures.lock"))
+    with lock:
+        ensure_test_fixtures()
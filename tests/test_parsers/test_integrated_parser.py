@@ -1,22 +1,26 @@
 """
 Tests for the FilingParser integrated class.
+
+Requires both secsgml and secxbrl; the module is skipped at collection
+otherwise (see test_integrated_parser_unavailable.py for the remaining cases).
 """
 
 import pytest
-from unittest.mock import Mock, patch
+
+pytest.importorskip("secsgml", reason="Both secsgml and secxbrl libraries required")
+pytest.importorskip("secxbrl", reason="Both secsgml and secxbrl libraries required")
 
 from sec_extractor.parsers.base import ParsingResult, FilingMetadata
-from sec_extractor.parsers.integrated_parser import FilingParser, SECSGML_AVAILABLE, SECXBRL_AVAILABLE
+from sec_extractor.parsers.integrated_parser import FilingParser
 
 
-@pytest.mark.skipif(not (SECSGML_AVAILABLE and SECXBRL_AVAILABLE), 
-                    reason="Both secsgml and secxbrl libraries required")
 class TestFilingParser:
     """Test cases for FilingParser."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.parser = FilingParser()
+    @pytest.fixture(autouse=True)
+    def _bind(self, filing_parser):
+        """Bind the session-wide parser instead of building one per test."""
+        self.parser = filing_parser
     
     def test_parser_initialization(self):
         """Test parser can be initialized with options."""
@@ -41,33 +45,30 @@ class TestFilingParser:
         assert "txt" in formats
         assert "xml" in formats
     
-    def test_is_compatible_sgml_content(self, sample_sgml_content):
-        """Test compatibility check with SGML content."""
-        assert self.parser.is_compatible(sample_sgml_content)
-    
-    def test_is_compatible_xbrl_content(self, sample_xbrl_content):
-        """Test compatibility check with XBRL content.""" 
-        assert self.parser.is_compatible(sample_xbrl_content)
-    
-    def test_is_compatible_invalid_content(self):
-        """Test compatibility check with invalid content."""
-        invalid_content = "This is just plain text without any SEC markers"
-        assert not self.parser.is_compatible(invalid_content)
-    
-    def test_determine_parser_strategy_sgml(self, sample_sgml_content):
-        """Test parser strategy determination for SGML content."""
-        strategy = self.parser.determine_parser_strategy(sample_sgml_content)
-        
-        assert strategy["use_sgml"] == True
-        assert strategy["primary_parser"] == "sgml"
-        # May also use XBRL if SGML content contains XBRL
-    
-    def test_determine_parser_strategy_xbrl(self, sample_xbrl_content):
-        """Test parser strategy determination for XBRL content."""
-        strategy = self.parser.determine_parser_strategy(sample_xbrl_content)
-        
-        assert strategy["use_xbrl"] == True
-        assert strategy["primary_parser"] == "xbrl"
+    @pytest.mark.parametrize("content_fixture,expected", [
+        ("sample_sgml_content", True),
+        ("sample_xbrl_content", True),
+        (None, False),  # plain text without any SEC markers
+    ], ids=["sgml", "xbrl", "invalid"])
+    def test_is_compatible(self, request, content_fixture, expected):
+        """Test compatibility check across SGML, XBRL and invalid content."""
+        if content_fixture:
+            content = request.getfixturevalue(content_fixture)
+        else:
+            content = "This is just plain text without any SEC markers"
+        assert self.parser.is_compatible(content) == expected
+    
+    @pytest.mark.parametrize("content_fixture,use_flag,primary_parser", [
+        # SGML content may also use XBRL if it embeds inline XBRL
+        ("sample_sgml_content", "use_sgml", "sgml"),
+        ("sample_xbrl_content", "use_xbrl", "xbrl"),
+    ], ids=["sgml", "xbrl"])
+    def test_determine_parser_strategy(self, request, content_fixture, use_flag, primary_parser):
+        """Test parser strategy determination for SGML and XBRL content."""
+        strategy = self.parser.determine_parser_strategy(request.getfixturevalue(content_fixture))
+        
+        assert strategy[use_flag] == True
+        assert strategy["primary_parser"] == primary_parser
     
     def test_parse_sgml_content_success(self, sample_sgml_content):
         """Test successful parsing of SGML content."""
@@ -194,50 +195,3 @@ class TestFilingParser:
             assert isinstance(xbrl_content, str)
             assert len(xbrl_content) > 0
 
-
-@pytest.mark.skipif(SECSGML_AVAILABLE and SECXBRL_AVAILABLE, 
-                    reason="Test for missing dependencies")
-class TestFilingParserUnavailable:
-    """Test behavior when dependencies are not available."""
-    
-    @patch('sec_extractor.parsers.integrated_parser.SECSGML_AVAILABLE', False)
-    @patch('sec_extractor.parsers.integrated_parser.SECXBRL_AVAILABLE', False)
-    def test_initialization_fails_no_parsers(self):
-        """Test parser initialization fails when no sub-parsers available."""
-        with pytest.raises(RuntimeError) as exc_info:
-            FilingParser()
-        assert "No parsers available" in str(exc_info.value)
-
-
-class TestFilingParserConfiguration:
-    """Test various FilingParser configurations."""
-    
-    @pytest.mark.skipif(not SECSGML_AVAILABLE, reason="secsgml library not available")
-    def test_sgml_only_configuration(self):
-        """Test parser with only SGML enabled."""
-        parser = FilingParser(enable_sgml=True, enable_xbrl=False)
-        
-        assert parser.enable_sgml == True
-        assert parser.enable_xbrl == False
-        assert parser.sgml_parser is not None
-        assert parser.xbrl_parser is None
-        
-        # Should support SGML formats only
-        formats = parser.supported_formats
-        assert "sgml" in formats
-        assert "txt" in formats
-    
-    @pytest.mark.skipif(not SECXBRL_AVAILABLE, reason="secxbrl library not available")
-    def test_xbrl_only_configuration(self):
-        """Test parser with only XBRL enabled."""
-        parser = FilingParser(enable_sgml=False, enable_xbrl=True)
-        
-        assert parser.enable_sgml == False
-        assert parser.enable_xbrl == True
-        assert parser.sgml_parser is None
-        assert parser.xbrl_parser is not None
-        
-        # Should support XBRL formats only
-        formats = parser.supported_formats
-        assert "xbrl" in formats
-        assert "xml" in formats
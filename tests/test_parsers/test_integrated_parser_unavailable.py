@@ -0,0 +1,59 @@
+"""
+Tests for FilingParser with missing or partial optional dependencies.
+
+Kept apart from test_integrated_parser.py, which is skipped at collection
+unless both secsgml and secxbrl are installed.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from sec_extractor.parsers.integrated_parser import FilingParser, SECSGML_AVAILABLE, SECXBRL_AVAILABLE
+
+
+@pytest.mark.skipif(SECSGML_AVAILABLE and SECXBRL_AVAILABLE, 
+                    reason="Test for missing dependencies")
+class TestFilingParserUnavailable:
+    """Test behavior when dependencies are not available."""
+    
+    @patch('sec_extractor.parsers.integrated_parser.SECSGML_AVAILABLE', False)
+    @patch('sec_extractor.parsers.integrated_parser.SECXBRL_AVAILABLE', False)
+    def test_initialization_fails_no_parsers(self):
+        """Test parser initialization fails when no sub-parsers available."""
+        with pytest.raises(RuntimeError) as exc_info:
+            FilingParser()
+        assert "No parsers available" in str(exc_info.value)
+
+
+class TestFilingParserConfiguration:
+    """Test various FilingParser configurations."""
+    
+    @pytest.mark.skipif(not SECSGML_AVAILABLE, reason="secsgml library not available")
+    def test_sgml_only_configuration(self):
+        """Test parser with only SGML enabled."""
+        parser = FilingParser(enable_sgml=True, enable_xbrl=False)
+        
+        assert parser.enable_sgml == True
+        assert parser.enable_xbrl == False
+        assert parser.sgml_parser is not None
+        assert parser.xbrl_parser is None
+        
+        # Should support SGML formats only
+        formats = parser.supported_formats
+        assert "sgml" in formats
+        assert "txt" in formats
+    
+    @pytest.mark.skipif(not SECXBRL_AVAILABLE, reason="secxbrl library not available")
+    def test_xbrl_only_configuration(self):
+        """Test parser with only XBRL enabled."""
+        parser = FilingParser(enable_sgml=False, enable_xbrl=True)
+        
+        assert parser.enable_sgml == False
+        assert parser.enable_xbrl == True
+        assert parser.sgml_parser is None
+        assert parser.xbrl_parser is not None
+        
+        # Should support XBRL formats only
+        formats = parser.supported_formats
+        assert "xbrl" in formats
+        assert "xml" in formats
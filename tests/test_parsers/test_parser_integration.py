@@ -0,0 +1,74 @@
+"""
+Tests for the ParserManager fallback extraction (no sub-parsers required).
+"""
+
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from sec_extractor.core import parser_integration
+from sec_extractor.core.parser_integration import ParserManager
+
+
+FACTS_CONTENT = '''<html xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"><body>
+<ix:nonFraction name="oef:AcctVal" contextRef="ctx1" unitRef="USD">10000</ix:nonFraction>
+<ix:nonFraction name="oef:AcctVal" contextRef="ctx2" unitRef="USD">20000</ix:nonFraction>
+<ix:nonNumeric name="dei:EntityRegistrantName" contextRef="ctx1">Test Fund</ix:nonNumeric>
+<ix:nonFraction contextRef="ctx1">999</ix:nonFraction>
+</body></html>'''
+
+
+@pytest.fixture(scope="module")
+def manager():
+    """ParserManager used only for its fallback path (stateless)."""
+    return ParserManager()
+
+
+class TestFallbackExtraction:
+    """Test the fallback result contract."""
+    
+    def test_no_facts_keeps_legacy_output(self, manager):
+        """Test content without inline XBRL reports no facts and empty metrics."""
+        result = manager._fallback_extraction("<html><body>No facts</body></html>", {}, "standard")
+        
+        assert result["success"]
+        assert result["extraction_method"] == "fallback_standard"
+        assert result["xbrl_facts_count"] == 0
+        assert result["xbrl_metrics"] == {}
+    
+    def test_facts_are_counted_and_summarised(self, manager):
+        """Test inline XBRL facts with a name are counted and summarised."""
+        result = manager._fallback_extraction(FACTS_CONTENT, {}, "standard")
+        
+        # The fact without a name attribute is skipped
+        assert result["xbrl_facts_count"] == 3
+        metrics = result["xbrl_metrics"]
+        assert metrics["total_facts"] == 3
+        assert metrics["unique_concepts"] == 2
+        assert metrics["unique_contexts"] == 2
+        assert metrics["sample_facts"][0] == {
+            "concept": "oef:AcctVal", "value": "10000", "unit_ref": "USD", "context_ref": "ctx1"
+        }
+        assert metrics["concept_summary"]["oef:AcctVal"] == {
+            "count": 2, "sample_value": "10000", "unit_ref": "USD"
+        }
+    
+    def test_metrics_match_parser_summary_shape(self, manager):
+        """Test fallback metrics have the same shape as the parser-path summary."""
+        result = manager._fallback_extraction(FACTS_CONTENT, {}, "standard")
+        facts = [SimpleNamespace(**fact) for fact in result["xbrl_metrics"]["sample_facts"]]
+        
+        assert manager._extract_xbrl_facts_summary(facts) == result["xbrl_metrics"]
+    
+    def test_bytes_and_stream_match_text(self, manager, monkeypatch):
+        """Test bytes input and chunked streams give the same result as text."""
+        expected = manager._fallback_extraction(FACTS_CONTENT, {}, "standard")
+        data = FACTS_CONTENT.encode("utf-8")
+        
+        assert manager._fallback_extraction(data, {}, "standard") == expected
+        assert manager._fallback_extraction(memoryview(data), {}, "standard") == expected
+        
+        # Tiny chunks so facts straddle chunk boundaries
+        monkeypatch.setattr(parser_integration, "_STREAM_CHUNK_SIZE", 7)
+        assert manager.parse_filing_stream(io.BytesIO(data), {}, "standard") == expected
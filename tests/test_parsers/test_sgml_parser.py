@@ -1,21 +1,27 @@
 """
 Tests for the SGMLParser class.
+
+Skipped at collection when secsgml is missing; the unavailable-library case
+lives in test_sgml_parser_unavailable.py.
 """
 
+import time
 import pytest
 from unittest.mock import Mock, patch
 
+pytest.importorskip("secsgml", reason="secsgml library not available")
+
 from sec_extractor.parsers.base import ParsingResult, FilingMetadata
 from sec_extractor.parsers.sgml_parser import SGMLParser, SECSGML_AVAILABLE
 
 
-@pytest.mark.skipif(not SECSGML_AVAILABLE, reason="secsgml library not available")
 class TestSGMLParser:
     """Test cases for SGMLParser."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.parser = SGMLParser()
+    @pytest.fixture(autouse=True)
+    def _bind(self, sgml_parser):
+        """Bind the session-wide parser instead of building one per test."""
+        self.parser = sgml_parser
     
     def test_parser_initialization(self):
         """Test parser can be initialized with options."""
@@ -40,10 +46,31 @@ class TestSGMLParser:
         invalid_content = "This is just plain text without SGML markers"
         assert not self.parser.is_compatible(invalid_content)
     
-    def test_is_compatible_bytes_input(self, sample_sgml_content):
+    def test_is_compatible_bytes_input(self, sample_sgml_bytes):
         """Test compatibility check with bytes input."""
-        content_bytes = sample_sgml_content.encode('utf-8')
-        assert self.parser.is_compatible(content_bytes)
+        assert self.parser.is_compatible(sample_sgml_bytes)
+    
+    @pytest.mark.parametrize("make_content,expected", [
+        (lambda n: "x" * n + "<sec-header>", True),           # marker at the very end
+        (lambda n: b"x" * n + b"ACCESSION-NUMBER:", True),    # raw bytes, not decoded
+        (lambda n: "x" * n, False),                           # full scan, no marker
+    ], ids=["str_tail_marker", "bytes_tail_marker", "no_marker"])
+    def test_is_compatible_large_content(self, make_content, expected):
+        """Test compatibility check scales linearly from 64KB to 1MB inputs."""
+        small, large = make_content(1 << 16), make_content(1 << 20)
+        assert self.parser.is_compatible(large) == expected
+        
+        def best_time(content, runs=5):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                self.parser.is_compatible(content)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+        
+        # 16x the input should cost ~16x; relative to a same-process baseline
+        # so a loaded runner slows both sides (a quadratic scan would be ~256x)
+        assert best_time(large) < 64 * best_time(small)
     
     def test_is_compatible_malformed_content(self):
         """Test compatibility check handles malformed content gracefully."""
@@ -104,6 +131,16 @@ class TestSGMLParser:
         assert not result.success
         assert "Unexpected secsgml result format" in result.error_message
     
+    @patch('sec_extractor.parsers.sgml_parser.secsgml')
+    def test_parse_bytes_passed_through(self, mock_secsgml, sample_sgml_bytes):
+        """Test bytes input reaches secsgml as-is, without a decode/encode round trip."""
+        mock_secsgml.parse_sgml_content_into_memory.return_value = ({}, [])
+        content = bytes(sample_sgml_bytes)
+        
+        self.parser.parse(content)
+        
+        assert mock_secsgml.parse_sgml_content_into_memory.call_args.args[0] is content
+    
     def test_parse_incompatible_content(self):
         """Test parsing rejects incompatible content."""
         invalid_content = "This is not SGML content"
@@ -145,25 +182,11 @@ class TestSGMLParser:
         assert "configuration" in info
 
 
-@pytest.mark.skipif(SECSGML_AVAILABLE, reason="Test for missing secsgml library")
-class TestSGMLParserUnavailable:
-    """Test behavior when secsgml library is not available."""
-    
-    def test_initialization_fails(self):
-        """Test parser initialization fails when secsgml unavailable."""
-        with pytest.raises(ImportError) as exc_info:
-            SGMLParser()
-        assert "secsgml library is not available" in str(exc_info.value)
-
-
 class TestSGMLParserMetadataExtraction:
     """Test metadata extraction functionality."""
     
-    @pytest.mark.skipif(not SECSGML_AVAILABLE, reason="secsgml library not available")
-    def test_extract_metadata_complete(self):
+    def test_extract_metadata_complete(self, sgml_parser):
         """Test metadata extraction with complete data."""
-        parser = SGMLParser()
-        
         metadata_dict = {
             "accession_number": "0001193125-24-194739",
             "central_index_key": "0001084380",
@@ -176,7 +199,7 @@ class TestSGMLParserMetadataExtraction:
             "fiscal_year_end": "0531"
         }
         
-        result = parser._extract_metadata(metadata_dict)
+        result = sgml_parser._extract_metadata(metadata_dict)
         
         assert isinstance(result, FilingMetadata)
         assert result.accession_number == "0001193125-24-194739"
@@ -186,28 +209,22 @@ class TestSGMLParserMetadataExtraction:
         assert result.filing_date == "20240731"
         assert result.period_of_report == "20240531"
     
-    @pytest.mark.skipif(not SECSGML_AVAILABLE, reason="secsgml library not available")
-    def test_extract_metadata_minimal(self):
+    def test_extract_metadata_minimal(self, sgml_parser):
         """Test metadata extraction with minimal data."""
-        parser = SGMLParser()
-        
         metadata_dict = {
             "accession_number": "0001234567-24-123456"
         }
         
-        result = parser._extract_metadata(metadata_dict)
+        result = sgml_parser._extract_metadata(metadata_dict)
         
         assert isinstance(result, FilingMetadata)
         assert result.accession_number == "0001234567-24-123456"
         assert result.cik is None
         assert result.company_name is None
     
-    @pytest.mark.skipif(not SECSGML_AVAILABLE, reason="secsgml library not available")
-    def test_extract_metadata_error_handling(self):
+    def test_extract_metadata_error_handling(self, sgml_parser):
         """Test metadata extraction handles errors gracefully."""
-        parser = SGMLParser()
-        
         # Pass invalid data type
-        result = parser._extract_metadata("not a dict")
+        result = sgml_parser._extract_metadata("not a dict")
         
         assert result is None
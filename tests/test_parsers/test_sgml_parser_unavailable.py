@@ -0,0 +1,20 @@
+"""
+Tests for SGMLParser when the secsgml library is not installed.
+"""
+
+import pytest
+
+from sec_extractor.parsers.sgml_parser import SGMLParser, SECSGML_AVAILABLE
+
+if SECSGML_AVAILABLE:
+    pytest.skip("Test for missing secsgml library", allow_module_level=True)
+
+
+class TestSGMLParserUnavailable:
+    """Test behavior when secsgml library is not available."""
+    
+    def test_initialization_fails(self):
+        """Test parser initialization fails when secsgml unavailable."""
+        with pytest.raises(ImportError) as exc_info:
+            SGMLParser()
+        assert "secsgml library is not available" in str(exc_info.value)